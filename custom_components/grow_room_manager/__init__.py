@@ -1,18 +1,28 @@
 """Grow Room Manager integration for Home Assistant."""
 from __future__ import annotations
 
-import json
 import logging
-from datetime import datetime, timedelta
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 from homeassistant.exceptions import HomeAssistantError
 
 from .const import (
@@ -35,6 +45,7 @@ from .const import (
     PHASE_LATE_VEG,
     PHASE_MOTHER,
     VEG_STAGE_DURATIONS,
+    VEG_STAGE_OFFSETS,
     SERVICE_ADD_JOURNAL,
     SERVICE_GENERATE_TASKS,
     SERVICE_CLEAR_TASKS,
@@ -46,7 +57,40 @@ from .const import (
     SERVICE_MOVE_TO_FLOWER,
     SERVICE_LIST_VEG_BATCHES,
     SERVICE_GET_JOURNAL,
+    SERVICE_SEARCH_JOURNAL,
+    SERVICE_CLEANUP_SNAPSHOTS,
+    SERVICE_BUILD_TIMELAPSE,
+    DEFAULT_TASK_CONCURRENCY,
+    DEFAULT_EXPORT_RETENTION,
+    SNAPSHOT_TIMEOUT,
+    SNAPSHOT_GC_GRACE,
+    VEG_BATCH_EVENT_LIMIT,
+    SIGNAL_JOURNAL_UPDATED,
+    SIGNAL_VEG_BATCHES_UPDATED,
+)
+from .batches import (
+    VegBatchRepository,
+    batches_path,
+    get_batch_archive,
+    get_batch_repository,
+    get_batch_writer,
 )
+from .coordinator import GrowRoomCoordinator
+from .export import (
+    EXPORT_CSV,
+    EXPORT_FORMATS,
+    export_filename,
+    export_journal,
+    load_checkpoints,
+    prune_exports,
+    save_checkpoint,
+)
+from .journal import get_journal_store
+from .search import get_search_index
+from .snapshots import async_capture_snapshots, get_snapshot_refs
+from .storage import CorruptFileError, async_report_corrupt_file, load_json
+from .tasks import TaskSpec, async_get_task_ledger, async_sync_tasks
+from .timelapse import build_timelapse, collect_frames
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -112,10 +156,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Ensure directories exist
     await hass.async_add_executor_job(_ensure_directories, hass, room_id)
+    await _async_load_journal(hass, room_id)
     
     # Load veg batches for veg rooms
     if room_type == ROOM_TYPE_VEG:
-        await hass.async_add_executor_job(_load_veg_batches, hass, room_id)
+        await _async_load_veg_batches(hass, room_id)
+        writer = get_batch_writer(hass, room_id)
+        
+        async def flush_veg_batches(_event: Event) -> None:
+            await writer.async_flush()
+        
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, flush_veg_batches)
+        )
+    
+    # Flower room sensors share one coordinator per room
+    if room_type == ROOM_TYPE_FLOWER:
+        coordinator = GrowRoomCoordinator(hass, entry)
+        await coordinator.async_config_entry_first_refresh()
+        coordinator.async_start()
+        hass.data[DOMAIN].setdefault("coordinators", {})[room_id] = coordinator
     
     # Register services (only once)
     await _async_register_services(hass)
@@ -154,11 +214,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     room_id = entry.data[CONF_ROOM_ID]
     
+    # Write pending veg batch changes before the room goes away
+    writer = hass.data[DOMAIN].get("batch_writers", {}).pop(room_id, None)
+    if writer is not None:
+        await writer.async_flush()
+    
     # Unload platforms
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
         hass.data[DOMAIN]["rooms"].pop(room_id, None)
+        hass.data[DOMAIN].get("coordinators", {}).pop(room_id, None)
+        index = hass.data[DOMAIN].get("search_indexes", {}).pop(room_id, None)
+        if index is not None:
+            await hass.async_add_executor_job(index.close)
         _LOGGER.info("Grow Room Manager: Room '%s' unloaded", room_id)
     
     return unload_ok
@@ -183,33 +252,64 @@ def _ensure_directories(hass: HomeAssistant, room_id: str) -> None:
     room_www.mkdir(parents=True, exist_ok=True)
 
 
-def _load_veg_batches(hass: HomeAssistant, room_id: str) -> None:
-    """Load veg batches from file."""
-    config_path = hass.config.path()
-    batches_file = Path(config_path) / "grow_logs" / f"{room_id}_batches.json"
-    
-    if batches_file.exists():
-        try:
-            with open(batches_file, "r") as f:
-                batches = json.load(f)
-                hass.data[DOMAIN]["veg_batches"][room_id] = batches
-                _LOGGER.info("Loaded %d veg batches for %s", len(batches), room_id)
-        except (json.JSONDecodeError, IOError) as err:
-            _LOGGER.error("Error loading veg batches: %s", err)
-            hass.data[DOMAIN]["veg_batches"][room_id] = []
-    else:
-        hass.data[DOMAIN]["veg_batches"][room_id] = []
+async def _async_load_journal(hass: HomeAssistant, room_id: str) -> None:
+    """Open a room's journal, migrating a legacy one."""
+    store = get_journal_store(hass, room_id)
+    try:
+        await hass.async_add_executor_job(store.count)
+    except CorruptFileError as err:
+        # The damaged journal is kept aside; start empty and ask the user to repair it
+        _LOGGER.error("Error loading journal: %s", err)
+        async_report_corrupt_file(hass, err)
 
 
-def _save_veg_batches(hass: HomeAssistant, room_id: str) -> None:
-    """Save veg batches to file."""
-    config_path = hass.config.path()
-    batches_file = Path(config_path) / "grow_logs" / f"{room_id}_batches.json"
-    batches = hass.data[DOMAIN]["veg_batches"].get(room_id, [])
+async def _async_load_veg_batches(hass: HomeAssistant, room_id: str) -> None:
+    """Load veg batches from file."""
+    try:
+        batches = await hass.async_add_executor_job(load_json, batches_path(hass, room_id), list)
+    except CorruptFileError as err:
+        # The damaged file is kept aside; start empty and ask the user to repair it
+        _LOGGER.error("Error loading veg batches: %s", err)
+        async_report_corrupt_file(hass, err)
+        batches = []
+    repo = VegBatchRepository(batches)
+    hass.data[DOMAIN]["veg_batches"][room_id] = repo
+    _LOGGER.info("Loaded %d veg batches for %s", len(batches), room_id)
+    
+    # Move batches that went inactive before archiving existed, or before a
+    # crash, out of the live file
+    inactive = [b for b in batches if not b.get("active", True)]
+    if inactive:
+        await hass.async_add_executor_job(get_batch_archive(hass, room_id).archive, inactive)
+        for batch in inactive:
+            repo.remove(batch["batch_id"])
+        get_batch_writer(hass, room_id).async_schedule_save()
+        _LOGGER.info("Archived %d inactive veg batches for %s", len(inactive), room_id)
+
+
+async def _async_store_veg_batch(hass: HomeAssistant, room_id: str, batch: dict[str, Any]) -> None:
+    """Persist a changed batch, moving it to the archive once it is inactive."""
+    repo = get_batch_repository(hass, room_id)
+    writer = get_batch_writer(hass, room_id)
+    archive = get_batch_archive(hass, room_id)
+    batch_id = batch["batch_id"]
+    
+    if batch.get("active", True):
+        if batch_id not in repo:
+            # Reactivated: make the live copy durable before dropping the archived one
+            repo.add(batch)
+            writer.async_schedule_save()
+            await writer.async_flush()
+            await hass.async_add_executor_job(archive.remove, batch_id)
+        else:
+            writer.async_schedule_save()
+        return
     
-    batches_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(batches_file, "w") as f:
-        json.dump(batches, f, indent=2)
+    # Archive before removing from the live file so a crash can only leave a
+    # duplicate, which is archived again on the next load
+    await hass.async_add_executor_job(archive.archive, [batch])
+    if repo.remove(batch_id) is not None:
+        writer.async_schedule_save()
 
 
 async def _async_register_services(hass: HomeAssistant) -> None:
@@ -223,7 +323,7 @@ async def _async_register_services(hass: HomeAssistant) -> None:
     service_journal_schema = vol.Schema({
         vol.Required("room_id"): cv.string,
         vol.Required("note"): cv.string,
-        vol.Optional("image_entity"): cv.entity_id,
+        vol.Optional("image_entity"): cv.entity_ids,
     })
     
     service_generate_schema = vol.Schema({
@@ -231,6 +331,9 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         vol.Required("start_date"): cv.date,
         vol.Optional("calendar_entity"): cv.entity_id,
         vol.Optional("todo_entity"): cv.entity_id,
+        vol.Optional("max_concurrency", default=DEFAULT_TASK_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=50)
+        ),
     })
     
     service_clear_schema = vol.Schema({
@@ -239,7 +342,9 @@ async def _async_register_services(hass: HomeAssistant) -> None:
     
     service_export_schema = vol.Schema({
         vol.Required("room_id"): cv.string,
-        vol.Optional("format", default="csv"): vol.In(["csv", "json"]),
+        vol.Optional("format", default=EXPORT_CSV): vol.In(EXPORT_FORMATS),
+        vol.Optional("full", default=False): cv.boolean,
+        vol.Optional("retention", default=DEFAULT_EXPORT_RETENTION): cv.positive_int,
     })
     
     service_set_start_schema = vol.Schema({
@@ -283,11 +388,41 @@ async def _async_register_services(hass: HomeAssistant) -> None:
     service_list_veg_batches_schema = vol.Schema({
         vol.Required("room_id"): cv.string,
         vol.Optional("active_only", default=True): cv.boolean,
+        vol.Optional("offset", default=0): cv.positive_int,
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+        vol.Optional("cursor"): cv.string,
+        vol.Optional("fields"): vol.All(cv.ensure_list_csv, [cv.string]),
     })
     
     service_get_journal_schema = vol.Schema({
         vol.Required("room_id"): cv.string,
         vol.Optional("limit", default=50): cv.positive_int,
+        vol.Optional("offset", default=0): cv.positive_int,
+        vol.Optional("since"): vol.Any(cv.datetime, cv.date),
+        vol.Optional("until"): vol.Any(cv.datetime, cv.date),
+        vol.Optional("cursor"): cv.string,
+        vol.Optional("fields"): vol.All(cv.ensure_list_csv, [cv.string]),
+    })
+
+    service_search_journal_schema = vol.Schema({
+        vol.Required("room_id"): cv.string,
+        vol.Required("query"): cv.string,
+        vol.Optional("limit", default=20): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+    })
+
+    service_cleanup_snapshots_schema = vol.Schema({
+        vol.Required("room_id"): cv.string,
+        vol.Optional("dry_run", default=True): cv.boolean,
+    })
+
+    service_build_timelapse_schema = vol.Schema({
+        vol.Required("room_id"): cv.string,
+        vol.Optional("camera"): cv.entity_id,
+        vol.Optional("since"): vol.Any(cv.datetime, cv.date),
+        vol.Optional("until"): vol.Any(cv.datetime, cv.date),
+        vol.Optional("fps", default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=30)),
+        vol.Optional("width", default=480): vol.All(vol.Coerce(int), vol.Range(min=120, max=1280)),
+        vol.Optional("max_frames", default=600): vol.All(vol.Coerce(int), vol.Range(min=2, max=5000)),
     })
 
     async def handle_add_journal_entry(call: ServiceCall) -> None:
@@ -302,9 +437,10 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         """Handle the clear_tasks service call."""
         await _clear_tasks(hass, call.data)
 
-    async def handle_export_journal(call: ServiceCall) -> None:
+    async def handle_export_journal(call: ServiceCall) -> ServiceResponse:
         """Handle the export_journal service call."""
-        await _export_journal(hass, call.data)
+        result = await _export_journal(hass, call.data)
+        return result if call.return_response else None
 
     async def handle_set_start_date(call: ServiceCall) -> None:
         """Handle the set_start_date service call."""
@@ -326,13 +462,39 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         """Handle the move_to_flower service call."""
         await _move_to_flower(hass, call.data)
 
-    async def handle_list_veg_batches(call: ServiceCall) -> None:
+    async def handle_list_veg_batches(call: ServiceCall) -> ServiceResponse:
         """Handle the list_veg_batches service call."""
-        await _list_veg_batches(hass, call.data)
-
-    async def handle_get_journal(call: ServiceCall) -> None:
+        if call.return_response:
+            return await _list_veg_batches(hass, call.data)
+        # Events are size-limited, so without a response the list is paged
+        data = call.data
+        if data.get("limit") is None:
+            data = {**data, "limit": VEG_BATCH_EVENT_LIMIT}
+        result = await _list_veg_batches(hass, data)
+        hass.bus.async_fire(f"{DOMAIN}_veg_batches_list", result)
+        return None
+
+    async def handle_get_journal(call: ServiceCall) -> ServiceResponse:
         """Handle the get_journal service call."""
-        await _get_journal(hass, call.data)
+        result = await _get_journal(hass, call.data)
+        if call.return_response:
+            return result
+        hass.bus.async_fire(f"{DOMAIN}_journal_entries", result)
+        return None
+
+    async def handle_search_journal(call: ServiceCall) -> ServiceResponse:
+        """Handle the search_journal service call."""
+        return await _search_journal(hass, call.data)
+
+    async def handle_cleanup_snapshots(call: ServiceCall) -> ServiceResponse:
+        """Handle the cleanup_snapshots service call."""
+        result = await _cleanup_snapshots(hass, call.data)
+        return result if call.return_response else None
+
+    async def handle_build_timelapse(call: ServiceCall) -> ServiceResponse:
+        """Handle the build_timelapse service call."""
+        result = await _build_timelapse(hass, call.data)
+        return result if call.return_response else None
 
     hass.services.async_register(
         DOMAIN, SERVICE_ADD_JOURNAL, handle_add_journal_entry, schema=service_journal_schema
@@ -344,7 +506,8 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         DOMAIN, SERVICE_CLEAR_TASKS, handle_clear_tasks, schema=service_clear_schema
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_EXPORT_JOURNAL, handle_export_journal, schema=service_export_schema
+        DOMAIN, SERVICE_EXPORT_JOURNAL, handle_export_journal,
+        schema=service_export_schema, supports_response=SupportsResponse.OPTIONAL
     )
     hass.services.async_register(
         DOMAIN, SERVICE_SET_START_DATE, handle_set_start_date, schema=service_set_start_schema
@@ -362,93 +525,94 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         DOMAIN, SERVICE_MOVE_TO_FLOWER, handle_move_to_flower, schema=service_move_to_flower_schema
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LIST_VEG_BATCHES, handle_list_veg_batches, schema=service_list_veg_batches_schema
+        DOMAIN, SERVICE_LIST_VEG_BATCHES, handle_list_veg_batches,
+        schema=service_list_veg_batches_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_GET_JOURNAL, handle_get_journal,
+        schema=service_get_journal_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SEARCH_JOURNAL, handle_search_journal,
+        schema=service_search_journal_schema, supports_response=SupportsResponse.ONLY
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_GET_JOURNAL, handle_get_journal, schema=service_get_journal_schema
+        DOMAIN, SERVICE_CLEANUP_SNAPSHOTS, handle_cleanup_snapshots,
+        schema=service_cleanup_snapshots_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_BUILD_TIMELAPSE, handle_build_timelapse,
+        schema=service_build_timelapse_schema, supports_response=SupportsResponse.OPTIONAL
     )
     
     _LOGGER.info("Grow Room Manager services registered")
 
 
 async def _add_journal_entry(hass: HomeAssistant, data: dict[str, Any]) -> None:
-    """Add a journal entry with optional camera snapshot."""
+    """Add a journal entry with optional snapshots from one or more cameras."""
     room_id = data["room_id"]
     note = data["note"]
-    image_entity = data.get("image_entity")
+    # Several cameras may be given; keep each once, in order
+    image_entities = list(dict.fromkeys(data.get("image_entity") or []))
     
-    timestamp = datetime.now()
-    timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-    timestamp_iso = timestamp.isoformat()
+    timestamp_iso = dt_util.now().isoformat()
     
     config_path = hass.config.path()
     
-    # Ensure directory exists
-    journal_dir = Path(config_path) / "grow_logs"
-    journal_dir.mkdir(parents=True, exist_ok=True)
-    
-    journal_file = journal_dir / f"{room_id}.json"
-    
     # Prepare journal entry
     entry = {
         "timestamp": timestamp_iso,
         "note": note,
         "image_path": None,
         "image_url": None,
+        "thumb_path": None,
+        "thumb_url": None,
     }
     
-    # Handle camera snapshot if provided
-    if image_entity:
-        try:
-            from homeassistant.components.camera import async_get_image
-            image = await async_get_image(hass, image_entity)
-            image_filename = f"{timestamp_str}.jpg"
-            image_dir = Path(config_path) / "www" / "grow_logs" / room_id
-            image_dir.mkdir(parents=True, exist_ok=True)
-            image_path = image_dir / image_filename
-            
-            # Save image
-            await hass.async_add_executor_job(_write_image, image_path, image.content)
-            
-            entry["image_path"] = str(image_path)
-            entry["image_url"] = f"/local/grow_logs/{room_id}/{image_filename}"
-            _LOGGER.info("Saved snapshot to %s", image_path)
-        except Exception as err:
-            _LOGGER.error("Failed to get camera image from %s: %s", image_entity, err)
-    
-    # Load existing entries or create new list
-    entries = await hass.async_add_executor_job(_load_journal, journal_file)
-    entries.append(entry)
-    
-    # Save updated journal
-    await hass.async_add_executor_job(_save_journal, journal_file, entries)
+    # Take snapshots from all cameras at once
+    if image_entities:
+        room_url = f"/local/grow_logs/{room_id}"
+        image_dir = Path(config_path) / "www" / "grow_logs" / room_id
+        captured = await async_capture_snapshots(
+            hass, image_entities, image_dir, SNAPSHOT_TIMEOUT
+        )
+        images = [
+            {
+                "entity_id": entity_id,
+                "image_path": str(image_dir / snapshot.image),
+                "image_url": f"{room_url}/{snapshot.image}",
+                "thumb_path": str(image_dir / snapshot.thumbnail) if snapshot.thumbnail else None,
+                "thumb_url": f"{room_url}/{snapshot.thumbnail}" if snapshot.thumbnail else None,
+            }
+            for entity_id, snapshot in captured
+        ]
+        if images:
+            # The first camera's snapshot stays the entry's main image
+            entry.update({key: value for key, value in images[0].items() if key != "entity_id"})
+            entry["images"] = images
+            reused = sum(snapshot.reused for _entity_id, snapshot in captured)
+            _LOGGER.info(
+                "Saved %d snapshots to %s (%d identical to stored ones)",
+                len(images), image_dir, reused
+            )
+    
+    # Append to the room journal
+    store = get_journal_store(hass, room_id)
+    position = await hass.async_add_executor_job(store.append, entry)
+    try:
+        await hass.async_add_executor_job(get_search_index(hass, room_id).add, position, entry)
+    except (HomeAssistantError, sqlite3.Error) as err:
+        # The index catches up from the journal on the next search
+        _LOGGER.warning("Could not index journal entry for %s: %s", room_id, err)
+    try:
+        await hass.async_add_executor_job(get_snapshot_refs(hass, room_id).add, position, entry)
+    except OSError as err:
+        # The references catch up from the journal on the next cleanup
+        _LOGGER.warning("Could not record snapshot references for %s: %s", room_id, err)
+    async_dispatcher_send(hass, SIGNAL_JOURNAL_UPDATED.format(room_id))
     _LOGGER.info("Added journal entry for room %s", room_id)
 
 
-def _write_image(path: Path, content: bytes) -> None:
-    """Write image content to file."""
-    with open(path, "wb") as f:
-        f.write(content)
-
-
-def _load_journal(path: Path) -> list[dict]:
-    """Load journal entries from file."""
-    if path.exists():
-        try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    return []
-
-
-def _save_journal(path: Path, entries: list[dict]) -> None:
-    """Save journal entries to file."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(entries, f, indent=2)
-
-
 async def _generate_tasks(hass: HomeAssistant, data: dict[str, Any]) -> None:
     """Generate calendar events and todo items from Athena schedule."""
     room_id = data["room_id"]
@@ -478,150 +642,158 @@ async def _generate_tasks(hass: HomeAssistant, data: dict[str, Any]) -> None:
     
     _LOGGER.info("Generating tasks for room %s starting %s", room_id, start_date)
     
-    tasks_created = 0
+    specs = [
+        TaskSpec(
+            day=day_num,
+            title=f"[{room_id.upper()}] Day {day_num}: {task_info['title']}",
+            description=task_info["description"],
+            task_date=start_date + timedelta(days=day_num - 1),
+        )
+        for day_num, task_info in ATHENA_SCHEDULE.items()
+    ]
+    
+    # Only create, update or delete what differs from the task ledger
+    ledger = await async_get_task_ledger(hass, room_id)
+    report = await async_sync_tasks(
+        hass,
+        ledger,
+        room_id,
+        specs,
+        calendar_entity,
+        todo_entity,
+        data.get("max_concurrency", DEFAULT_TASK_CONCURRENCY),
+    )
     
-    # Generate tasks from schedule
-    for day_num, task_info in ATHENA_SCHEDULE.items():
-        task_date = start_date + timedelta(days=day_num - 1)
-        task_title = f"[{room_id.upper()}] Day {day_num}: {task_info['title']}"
-        task_description = task_info["description"]
-        
-        # Create calendar event
-        if calendar_entity:
-            try:
-                # Try all-day event first (start_date/end_date)
-                await hass.services.async_call(
-                    "calendar",
-                    "create_event",
-                    {
-                        "entity_id": calendar_entity,
-                        "summary": task_title,
-                        "description": task_description,
-                        "start_date": str(task_date),
-                        "end_date": str(task_date + timedelta(days=1)),
-                    },
-                    blocking=True,
-                )
-                _LOGGER.debug("Created calendar event: %s on %s", task_title, task_date)
-            except Exception as err:
-                _LOGGER.warning("All-day event failed, trying timed event: %s", err)
-                try:
-                    # Fall back to timed event
-                    start_dt = datetime.combine(task_date, datetime.min.time().replace(hour=8))
-                    end_dt = datetime.combine(task_date, datetime.min.time().replace(hour=9))
-                    await hass.services.async_call(
-                        "calendar",
-                        "create_event",
-                        {
-                            "entity_id": calendar_entity,
-                            "summary": task_title,
-                            "description": task_description,
-                            "start_date_time": start_dt.isoformat(),
-                            "end_date_time": end_dt.isoformat(),
-                        },
-                        blocking=True,
-                    )
-                    _LOGGER.debug("Created timed calendar event: %s on %s", task_title, task_date)
-                except Exception as err2:
-                    _LOGGER.error("Failed to create calendar event: %s", err2)
-        
-        # Create todo item
-        if todo_entity:
-            try:
-                # Try with description first
-                await hass.services.async_call(
-                    "todo",
-                    "add_item",
-                    {
-                        "entity_id": todo_entity,
-                        "item": task_title,
-                        "due_date": str(task_date),
-                        "description": task_description,
-                    },
-                    blocking=True,
-                )
-                _LOGGER.debug("Created todo item: %s", task_title)
-            except Exception as err:
-                _LOGGER.debug("Todo with description failed, trying without: %s", err)
-                try:
-                    # Fall back to without description (some integrations don't support it)
-                    await hass.services.async_call(
-                        "todo",
-                        "add_item",
-                        {
-                            "entity_id": todo_entity,
-                            "item": task_title,
-                            "due_date": str(task_date),
-                        },
-                        blocking=True,
-                    )
-                    _LOGGER.debug("Created todo item (no description): %s", task_title)
-                except Exception as err2:
-                    _LOGGER.error("Failed to create todo item: %s", err2)
-        
-        tasks_created += 1
+    hass.bus.async_fire(
+        f"{DOMAIN}_tasks_generated",
+        {"room_id": room_id, **report.as_dict()},
+    )
     
-    _LOGGER.info("Generated %d tasks for room %s", tasks_created, room_id)
+    _LOGGER.info(
+        "Synced tasks for room %s in %.1fs: %d created, %d updated, %d deleted, %d unchanged, %d failed",
+        room_id, report.duration, report.created, report.updated,
+        report.deleted, report.unchanged, report.failed
+    )
 
 
 async def _clear_tasks(hass: HomeAssistant, data: dict[str, Any]) -> None:
-    """Clear all tasks for a room."""
+    """Delete every task recorded in a room's task ledger."""
     room_id = data["room_id"]
     _LOGGER.info("Clear tasks requested for room %s", room_id)
-    _LOGGER.warning(
-        "Automatic task clearing is not fully supported. "
-        "Please manually clear calendar events and todo items for room %s.",
-        room_id
+    
+    ledger = await async_get_task_ledger(hass, room_id)
+    deleted = 0
+    failed = 0
+    for scope in list(ledger.scopes):
+        report = await async_sync_tasks(
+            hass, ledger, scope, [], None, None, DEFAULT_TASK_CONCURRENCY
+        )
+        deleted += report.deleted
+        failed += report.failed
+    
+    _LOGGER.info("Cleared %d tasks for room %s (%d failed)", deleted, room_id, failed)
+
+
+async def _clear_veg_batch_tasks(hass: HomeAssistant, room_id: str, batch_id: str) -> None:
+    """Delete the upcoming tasks of a veg batch that left the room."""
+    ledger = await async_get_task_ledger(hass, room_id)
+    if batch_id not in ledger.scopes:
+        return
+    
+    report = await async_sync_tasks(
+        hass, ledger, batch_id, [], None, None, DEFAULT_TASK_CONCURRENCY,
+        keep_before=dt_util.now().date(),
+    )
+    _LOGGER.info(
+        "Removed %d upcoming tasks for veg batch %s (%d failed)",
+        report.deleted, batch_id, report.failed
     )
 
 
-async def _export_journal(hass: HomeAssistant, data: dict[str, Any]) -> None:
-    """Export journal entries to CSV or JSON file."""
-    import csv
+async def _export_journal(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Export journal entries to a file in www/grow_logs, streaming them.
     
+    By default only entries added since the previous export in the same
+    format are written. ``full`` exports everything. Afterwards exports older
+    than the newest ``retention`` full exports are pruned.
+    """
     room_id = data["room_id"]
-    export_format = data.get("format", "csv")
+    export_format = data.get("format", EXPORT_CSV)
+    full = data.get("full", False)
+    retention = data.get("retention", DEFAULT_EXPORT_RETENTION)
     
     config_path = hass.config.path()
-    journal_file = Path(config_path) / "grow_logs" / f"{room_id}.json"
+    export_dir = Path(config_path) / "www" / "grow_logs"
+    image_dir = export_dir / room_id
+    checkpoint_file = Path(config_path) / "grow_logs" / f"{room_id}_export_checkpoint.json"
     
-    if not journal_file.exists():
-        raise HomeAssistantError(f"No journal found for room {room_id}")
+    store = get_journal_store(hass, room_id)
+    total = await hass.async_add_executor_job(store.count)
+    if not total:
+        raise HomeAssistantError(f"Journal for room {room_id} is empty")
     
-    entries = await hass.async_add_executor_job(_load_journal, journal_file)
+    start = 0
+    if not full:
+        checkpoints = await hass.async_add_executor_job(load_checkpoints, checkpoint_file)
+        start = checkpoints.get(export_format, {}).get("position", 0)
+        if start > total:
+            # The journal was replaced since the last export
+            start = 0
+    incremental = start > 0
+    
+    result_data: dict[str, Any] = {
+        "room_id": room_id,
+        "full": not incremental,
+        "since_position": start,
+        "path": None,
+        "url": None,
+        "entries": 0,
+        "images": 0,
+        "size": 0,
+    }
+    if start == total:
+        _LOGGER.info("No new journal entries to export for room %s", room_id)
+        return result_data
     
-    if not entries:
-        raise HomeAssistantError(f"Journal for room {room_id} is empty")
+    filename = export_filename(room_id, export_format, incremental)
+    export_file = export_dir / filename
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def report_progress(written: int, count: int) -> None:
+        # Called from the executor; EventBus.fire is thread safe
+        hass.bus.fire(
+            f"{DOMAIN}_export_progress",
+            {
+                "room_id": room_id,
+                "file": filename,
+                "written": written,
+                "total": count,
+                "percent": round(written * 100 / count) if count else 100,
+            },
+        )
     
-    if export_format == "csv":
-        export_file = Path(config_path) / "www" / "grow_logs" / f"{room_id}_export_{timestamp}.csv"
-        
-        def write_csv():
-            export_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(export_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["timestamp", "note", "image_url"])
-                writer.writeheader()
-                for entry in entries:
-                    writer.writerow({
-                        "timestamp": entry.get("timestamp", ""),
-                        "note": entry.get("note", ""),
-                        "image_url": entry.get("image_url", ""),
-                    })
-        
-        await hass.async_add_executor_job(write_csv)
-        _LOGGER.info("Exported journal to %s", export_file)
-    else:
-        export_file = Path(config_path) / "www" / "grow_logs" / f"{room_id}_export_{timestamp}.json"
-        
-        def write_json():
-            export_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(export_file, "w", encoding="utf-8") as f:
-                json.dump(entries, f, indent=2)
-        
-        await hass.async_add_executor_job(write_json)
-        _LOGGER.info("Exported journal to %s", export_file)
+    result = await hass.async_add_executor_job(
+        export_journal, store, export_file, export_format, image_dir, report_progress, start, total
+    )
+    await hass.async_add_executor_job(
+        save_checkpoint, checkpoint_file, export_format, total, filename, not incremental
+    )
+    removed = await hass.async_add_executor_job(
+        prune_exports, export_dir, room_id, export_format, retention
+    )
+    
+    _LOGGER.info(
+        "Exported %d journal entries and %d images to %s (%d old exports pruned)",
+        result.entries, result.images, export_file, len(removed)
+    )
+    result_data.update({
+        "path": str(export_file),
+        "url": f"/local/grow_logs/{filename}",
+        "entries": result.entries,
+        "images": result.images,
+        "size": result.size,
+        "pruned": [path.name for path in removed],
+    })
+    return result_data
 
 
 async def _set_start_date(hass: HomeAssistant, data: dict[str, Any]) -> None:
@@ -639,16 +811,24 @@ async def _set_start_date(hass: HomeAssistant, data: dict[str, Any]) -> None:
     entry_found = False
     for entry in hass.config_entries.async_entries(DOMAIN):
         if entry.data.get(CONF_ROOM_ID) == room_id:
-            # Update the config entry with new start date
-            new_data = {**entry.data, CONF_START_DATE: start_date}
-            hass.config_entries.async_update_entry(entry, data=new_data)
-            
-            # Also update the in-memory data
-            if room_id in hass.data[DOMAIN]["rooms"]:
-                hass.data[DOMAIN]["rooms"][room_id][CONF_START_DATE] = start_date
+            await _async_apply_start_date(hass, entry, start_date)
             
-            # Reload to update sensors
-            await hass.config_entries.async_reload(entry.entry_id)
+            # Move the room's tasks to the new dates in the background
+            calendar_entity = entry.data.get(CONF_CALENDAR_ENTITY)
+            todo_entity = entry.data.get(CONF_TODO_ENTITY)
+            if calendar_entity or todo_entity:
+                async def reschedule_tasks() -> None:
+                    try:
+                        await _generate_tasks(hass, {
+                            "room_id": room_id,
+                            "start_date": start_date,
+                            "calendar_entity": calendar_entity,
+                            "todo_entity": todo_entity,
+                        })
+                    except Exception as err:
+                        _LOGGER.warning("Could not reschedule tasks for %s: %s", room_id, err)
+
+                hass.async_create_task(reschedule_tasks())
             
             _LOGGER.info("Set start date for %s to %s", room_id, start_date)
             entry_found = True
@@ -660,10 +840,27 @@ async def _set_start_date(hass: HomeAssistant, data: dict[str, Any]) -> None:
         )
 
 
+async def _async_apply_start_date(
+    hass: HomeAssistant, entry: ConfigEntry, start_date: str
+) -> None:
+    """Change a room's start date in place without reloading its entry."""
+    room_id = entry.data[CONF_ROOM_ID]
+    
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_START_DATE: start_date}
+    )
+    if room_id in hass.data[DOMAIN]["rooms"]:
+        hass.data[DOMAIN]["rooms"][room_id][CONF_START_DATE] = start_date
+    
+    # Push the new date to the room's sensors now rather than waiting for
+    # the entry update listener
+    coordinator = hass.data[DOMAIN].get("coordinators", {}).get(room_id)
+    if coordinator:
+        await coordinator.async_set_start_date(datetime.strptime(start_date, "%Y-%m-%d").date())
+
+
 async def _get_today_tasks(hass: HomeAssistant, data: dict[str, Any]) -> None:
     """Get tasks for today and fire an event with the details."""
-    from datetime import date
-    
     room_id = data["room_id"]
     start_date = None
     
@@ -685,7 +882,7 @@ async def _get_today_tasks(hass: HomeAssistant, data: dict[str, Any]) -> None:
         )
     
     # Calculate current day
-    current_day = (date.today() - start_date).days + 1
+    current_day = (dt_util.now().date() - start_date).days + 1
     
     if current_day < 1:
         _LOGGER.info("Grow cycle for %s hasn't started yet", room_id)
@@ -740,7 +937,7 @@ async def _add_veg_batch(hass: HomeAssistant, data: dict[str, Any]) -> None:
         start_date = start_date.isoformat()
     
     # Generate unique batch ID
-    batch_id = f"{batch_name.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    batch_id = f"{batch_name.lower().replace(' ', '_')}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}"
     
     # Create batch record
     batch = {
@@ -753,7 +950,7 @@ async def _add_veg_batch(hass: HomeAssistant, data: dict[str, Any]) -> None:
         "destination_room": destination_room,
         "notes": notes,
         "active": True,
-        "created_at": datetime.now().isoformat(),
+        "created_at": dt_util.now().isoformat(),
         "stage_history": [
             {
                 "stage": stage,
@@ -764,13 +961,11 @@ async def _add_veg_batch(hass: HomeAssistant, data: dict[str, Any]) -> None:
     }
     
     # Add to batches
-    if room_id not in hass.data[DOMAIN]["veg_batches"]:
-        hass.data[DOMAIN]["veg_batches"][room_id] = []
-    
-    hass.data[DOMAIN]["veg_batches"][room_id].append(batch)
+    get_batch_repository(hass, room_id).add(batch)
     
     # Save to file
-    await hass.async_add_executor_job(_save_veg_batches, hass, room_id)
+    get_batch_writer(hass, room_id).async_schedule_save()
+    async_dispatcher_send(hass, SIGNAL_VEG_BATCHES_UPDATED.format(room_id))
     
     # Generate calendar/todo tasks for this batch
     calendar_entity = room_config.get(CONF_CALENDAR_ENTITY)
@@ -804,8 +999,6 @@ async def _generate_veg_batch_tasks(
     todo_entity: str | None
 ) -> None:
     """Generate calendar/todo tasks for a veg batch based on its stage."""
-    from datetime import date
-    
     batch_name = batch["batch_name"]
     batch_id = batch["batch_id"]
     start_date_str = batch["start_date"]
@@ -814,18 +1007,10 @@ async def _generate_veg_batch_tasks(
     start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
     
     # Calculate day offset based on current stage
-    stage_offsets = {
-        PHASE_CLONE: 0,
-        PHASE_PREVEG: 14,
-        PHASE_EARLY_VEG: 21,
-        PHASE_LATE_VEG: 35,
-        PHASE_MOTHER: 0,  # Mother has its own schedule
-    }
-    
-    day_offset = stage_offsets.get(stage, 0)
+    day_offset = VEG_STAGE_OFFSETS.get(stage, 0)
     
     # Generate tasks from VEG_SCHEDULE
-    tasks_created = 0
+    specs = []
     for day_num, task_info in VEG_SCHEDULE.items():
         # Only create tasks for current and future stages
         if day_num < day_offset + 1:
@@ -835,63 +1020,27 @@ async def _generate_veg_batch_tasks(
         task_date = start_date + timedelta(days=day_num - day_offset - 1)
         
         # Skip past dates
-        if task_date < date.today():
+        if task_date < dt_util.now().date():
             continue
         
-        task_title = f"[{room_id.upper()}:{batch_name}] Day {day_num - day_offset}: {task_info['title']}"
-        task_description = f"Batch: {batch_name}\nStrain: {batch.get('strain', 'N/A')}\n\n{task_info['description']}"
-        
-        # Create calendar event
-        if calendar_entity:
-            try:
-                await hass.services.async_call(
-                    "calendar",
-                    "create_event",
-                    {
-                        "entity_id": calendar_entity,
-                        "summary": task_title,
-                        "description": task_description,
-                        "start_date": str(task_date),
-                        "end_date": str(task_date + timedelta(days=1)),
-                    },
-                    blocking=True,
-                )
-            except Exception as err:
-                _LOGGER.warning("Failed to create calendar event: %s", err)
-        
-        # Create todo item
-        if todo_entity:
-            try:
-                await hass.services.async_call(
-                    "todo",
-                    "add_item",
-                    {
-                        "entity_id": todo_entity,
-                        "item": task_title,
-                        "due_date": str(task_date),
-                        "description": task_description,
-                    },
-                    blocking=True,
-                )
-            except Exception:
-                try:
-                    # Fall back to without description
-                    await hass.services.async_call(
-                        "todo",
-                        "add_item",
-                        {
-                            "entity_id": todo_entity,
-                            "item": task_title,
-                            "due_date": str(task_date),
-                        },
-                        blocking=True,
-                    )
-                except Exception as err:
-                    _LOGGER.warning("Failed to create todo item: %s", err)
-        
-        tasks_created += 1
+        specs.append(TaskSpec(
+            day=day_num,
+            title=f"[{room_id.upper()}:{batch_name}] Day {day_num - day_offset}: {task_info['title']}",
+            description=f"Batch: {batch_name}\nStrain: {batch.get('strain', 'N/A')}\n\n{task_info['description']}",
+            task_date=task_date,
+        ))
+    
+    # Past tasks are not in specs, so keep them in the calendar and ledger
+    ledger = await async_get_task_ledger(hass, room_id)
+    report = await async_sync_tasks(
+        hass, ledger, batch_id, specs, calendar_entity, todo_entity,
+        DEFAULT_TASK_CONCURRENCY, keep_before=dt_util.now().date(),
+    )
     
-    _LOGGER.info("Generated %d tasks for veg batch '%s'", tasks_created, batch_name)
+    _LOGGER.info(
+        "Synced tasks for veg batch '%s' in %.1fs: %d created, %d updated, %d deleted, %d failed",
+        batch_name, report.duration, report.created, report.updated, report.deleted, report.failed
+    )
 
 
 async def _update_veg_batch(hass: HomeAssistant, data: dict[str, Any]) -> None:
@@ -902,52 +1051,53 @@ async def _update_veg_batch(hass: HomeAssistant, data: dict[str, Any]) -> None:
     if room_id not in hass.data[DOMAIN]["veg_batches"]:
         raise HomeAssistantError(f"No batches found for room {room_id}")
     
-    batches = hass.data[DOMAIN]["veg_batches"][room_id]
-    batch_found = False
+    repo = hass.data[DOMAIN]["veg_batches"][room_id]
+    batch = repo.get(batch_id)
+    if batch is None:
+        batch = await hass.async_add_executor_job(get_batch_archive(hass, room_id).find, batch_id)
+    if batch is None:
+        raise HomeAssistantError(f"Batch {batch_id} not found in room {room_id}")
     
-    for batch in batches:
-        if batch["batch_id"] == batch_id:
-            batch_found = True
-            
-            # Update fields if provided
-            if "stage" in data and data["stage"] != batch["stage"]:
-                old_stage = batch["stage"]
-                batch["stage"] = data["stage"]
-                batch["stage_history"].append({
-                    "stage": data["stage"],
-                    "date": datetime.now().strftime("%Y-%m-%d"),
-                    "notes": f"Stage changed from {old_stage} to {data['stage']}"
-                })
-                
-                # Fire stage change event
-                hass.bus.async_fire(
-                    f"{DOMAIN}_veg_stage_changed",
-                    {
-                        "room_id": room_id,
-                        "batch_id": batch_id,
-                        "batch_name": batch["batch_name"],
-                        "old_stage": old_stage,
-                        "new_stage": data["stage"],
-                    }
-                )
-            
-            if "plant_count" in data:
-                batch["plant_count"] = data["plant_count"]
-            if "destination_room" in data:
-                batch["destination_room"] = data["destination_room"]
-            if "notes" in data:
-                batch["notes"] = data["notes"]
-            if "active" in data:
-                batch["active"] = data["active"]
-            
-            batch["updated_at"] = datetime.now().isoformat()
-            break
+    # Update fields if provided
+    if "stage" in data and data["stage"] != batch["stage"]:
+        old_stage = batch["stage"]
+        batch["stage"] = data["stage"]
+        batch["stage_history"].append({
+            "stage": data["stage"],
+            "date": dt_util.now().date().isoformat(),
+            "notes": f"Stage changed from {old_stage} to {data['stage']}"
+        })
+        
+        # Fire stage change event
+        hass.bus.async_fire(
+            f"{DOMAIN}_veg_stage_changed",
+            {
+                "room_id": room_id,
+                "batch_id": batch_id,
+                "batch_name": batch["batch_name"],
+                "old_stage": old_stage,
+                "new_stage": data["stage"],
+            }
+        )
     
-    if not batch_found:
-        raise HomeAssistantError(f"Batch {batch_id} not found in room {room_id}")
+    if "plant_count" in data:
+        batch["plant_count"] = data["plant_count"]
+    if "destination_room" in data:
+        batch["destination_room"] = data["destination_room"]
+    if "notes" in data:
+        batch["notes"] = data["notes"]
+    if "active" in data:
+        batch["active"] = data["active"]
+    
+    batch["updated_at"] = dt_util.now().isoformat()
+    repo.reindex(batch_id)
     
     # Save changes
-    await hass.async_add_executor_job(_save_veg_batches, hass, room_id)
+    await _async_store_veg_batch(hass, room_id, batch)
+    async_dispatcher_send(hass, SIGNAL_VEG_BATCHES_UPDATED.format(room_id))
+    
+    if data.get("active") is False:
+        await _clear_veg_batch_tasks(hass, room_id, batch_id)
     _LOGGER.info("Updated veg batch '%s' in room %s", batch_id, room_id)
 
 
@@ -958,7 +1108,7 @@ async def _move_to_flower(hass: HomeAssistant, data: dict[str, Any]) -> None:
     room_id = data["room_id"]
     batch_id = data["batch_id"]
     flower_room_id = data["flower_room_id"]
-    flower_start_date = data.get("flower_start_date", date.today())
+    flower_start_date = data.get("flower_start_date", dt_util.now().date())
     
     # Verify veg room exists
     if room_id not in hass.data[DOMAIN]["veg_batches"]:
@@ -973,30 +1123,28 @@ async def _move_to_flower(hass: HomeAssistant, data: dict[str, Any]) -> None:
         raise HomeAssistantError(f"Room {flower_room_id} is not a flower room")
     
     # Find and update the batch
-    batches = hass.data[DOMAIN]["veg_batches"][room_id]
-    batch_found = None
-    
-    for batch in batches:
-        if batch["batch_id"] == batch_id:
-            batch_found = batch
-            batch["active"] = False
-            batch["moved_to_flower"] = {
-                "flower_room_id": flower_room_id,
-                "date": datetime.now().isoformat(),
-                "flower_start_date": flower_start_date.isoformat() if isinstance(flower_start_date, date) else flower_start_date,
-            }
-            batch["stage_history"].append({
-                "stage": "Moved to Flower",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "notes": f"Moved to flower room {flower_room_id}"
-            })
-            break
-    
-    if not batch_found:
+    repo = hass.data[DOMAIN]["veg_batches"][room_id]
+    batch_found = repo.get(batch_id)
+    if batch_found is None:
         raise HomeAssistantError(f"Batch {batch_id} not found in room {room_id}")
     
-    # Save veg batch changes
-    await hass.async_add_executor_job(_save_veg_batches, hass, room_id)
+    batch_found["active"] = False
+    batch_found["moved_to_flower"] = {
+        "flower_room_id": flower_room_id,
+        "date": dt_util.now().isoformat(),
+        "flower_start_date": flower_start_date.isoformat() if isinstance(flower_start_date, date) else flower_start_date,
+    }
+    batch_found["stage_history"].append({
+        "stage": "Moved to Flower",
+        "date": dt_util.now().date().isoformat(),
+        "notes": f"Moved to flower room {flower_room_id}"
+    })
+    repo.reindex(batch_id)
+    
+    # Save veg batch changes, archiving the batch
+    await _async_store_veg_batch(hass, room_id, batch_found)
+    async_dispatcher_send(hass, SIGNAL_VEG_BATCHES_UPDATED.format(room_id))
+    await _clear_veg_batch_tasks(hass, room_id, batch_id)
     
     # Set the flower room start date
     if isinstance(flower_start_date, date):
@@ -1005,11 +1153,7 @@ async def _move_to_flower(hass: HomeAssistant, data: dict[str, Any]) -> None:
     # Update flower room start date
     for entry in hass.config_entries.async_entries(DOMAIN):
         if entry.data.get(CONF_ROOM_ID) == flower_room_id:
-            new_data = {**entry.data, CONF_START_DATE: flower_start_date}
-            hass.config_entries.async_update_entry(entry, data=new_data)
-            
-            if flower_room_id in hass.data[DOMAIN]["rooms"]:
-                hass.data[DOMAIN]["rooms"][flower_room_id][CONF_START_DATE] = flower_start_date
+            await _async_apply_start_date(hass, entry, flower_start_date)
             
             # Generate flower tasks
             calendar_entity = entry.data.get(CONF_CALENDAR_ENTITY)
@@ -1022,9 +1166,6 @@ async def _move_to_flower(hass: HomeAssistant, data: dict[str, Any]) -> None:
                     "calendar_entity": calendar_entity,
                     "todo_entity": todo_entity,
                 })
-            
-            # Reload to update sensors
-            await hass.config_entries.async_reload(entry.entry_id)
             break
     
     # Fire event
@@ -1047,54 +1188,215 @@ async def _move_to_flower(hass: HomeAssistant, data: dict[str, Any]) -> None:
     )
 
 
-async def _list_veg_batches(hass: HomeAssistant, data: dict[str, Any]) -> None:
-    """List veg batches and fire an event with the data."""
+async def _list_veg_batches(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """List a page of veg batches."""
     room_id = data["room_id"]
     active_only = data.get("active_only", True)
+    offset = _cursor_position(data, data.get("offset", 0))
+    limit = data.get("limit")
     
     if room_id not in hass.data[DOMAIN]["veg_batches"]:
         batches = []
+        total = 0
     else:
-        batches = hass.data[DOMAIN]["veg_batches"][room_id]
-        if active_only:
-            batches = [b for b in batches if b.get("active", True)]
-    
-    # Fire event with batch list
-    hass.bus.async_fire(
-        f"{DOMAIN}_veg_batches_list",
-        {
-            "room_id": room_id,
-            "batch_count": len(batches),
-            "batches": batches,
-        }
-    )
+        repo = hass.data[DOMAIN]["veg_batches"][room_id]
+        live = repo.active() if active_only else repo.all()
+        total = len(live)
+        batches = live[offset:None if limit is None else offset + limit]
+        
+        if not active_only:
+            # Archived batches follow the live ones, newest first, and only
+            # the years covering the requested page are read. A batch that is
+            # both live and archived is listed once, as live, and left out of
+            # the archive before paging so offsets and totals stay consistent.
+            archive = get_batch_archive(hass, room_id)
+            live_ids = frozenset(batch["batch_id"] for batch in live)
+            total += await hass.async_add_executor_job(archive.count, live_ids)
+            remaining = None if limit is None else limit - len(batches)
+            if remaining is None or remaining > 0:
+                archived = await hass.async_add_executor_job(
+                    archive.page, max(0, offset - len(live)), remaining, live_ids
+                )
+                batches.extend(archived)
     
+    end = offset + len(batches)
     _LOGGER.info("Listed %d batches for room %s", len(batches), room_id)
+    return {
+        "room_id": room_id,
+        "batch_count": len(batches),
+        "total_count": total,
+        "offset": offset,
+        "next_cursor": str(end) if batches and end < total else None,
+        "batches": _project(batches, data.get("fields")),
+    }
 
 
-async def _get_journal(hass: HomeAssistant, data: dict[str, Any]) -> None:
-    """Get journal entries and fire an event with the data."""
+async def _get_journal(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Get a page of journal entries, most recent first.
+    
+    ``since`` and ``until`` restrict the entries to a time range. ``offset``
+    skips the most recent matching entries. ``cursor`` is the position of
+    the oldest entry already returned, so paging by cursor stays stable while
+    new entries are added.
+    """
     room_id = data["room_id"]
-    limit = data.get("limit", 50)
     
-    config_path = hass.config.path()
-    journal_file = Path(config_path) / "grow_logs" / f"{room_id}.json"
+    store = get_journal_store(hass, room_id)
+    page = await hass.async_add_executor_job(
+        partial(
+            store.query,
+            since=_journal_timestamp(data.get("since")),
+            until=_journal_timestamp(data.get("until")),
+            cursor=_cursor_position(data, None),
+            offset=data.get("offset", 0),
+            limit=data.get("limit", 50),
+        )
+    )
     
-    entries = await hass.async_add_executor_job(_load_journal, journal_file)
+    _LOGGER.info("Retrieved %d journal entries for room %s", len(page.entries), room_id)
+    return {
+        "room_id": room_id,
+        "total_count": page.total,
+        "returned_count": len(page.entries),
+        "next_cursor": str(page.next_cursor) if page.next_cursor is not None else None,
+        "entries": _project(page.entries, data.get("fields")),
+    }
+
+
+async def _search_journal(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Search a room's journal notes, best matches first."""
+    room_id = data["room_id"]
+    query = data["query"]
     
-    # Get most recent entries up to limit
-    recent_entries = entries[-limit:] if len(entries) > limit else entries
-    recent_entries.reverse()  # Most recent first
+    index = get_search_index(hass, room_id)
+    result = await hass.async_add_executor_job(index.search, query, data.get("limit", 20))
     
-    # Fire event with journal entries
-    hass.bus.async_fire(
-        f"{DOMAIN}_journal_entries",
-        {
-            "room_id": room_id,
-            "total_count": len(entries),
-            "returned_count": len(recent_entries),
-            "entries": recent_entries,
-        }
+    _LOGGER.debug(
+        "Journal search for %r in %s: %d hits in %.1f ms",
+        query, room_id, len(result["hits"]), result["took_ms"]
     )
+    return {"room_id": room_id, "query": query, "count": len(result["hits"]), **result}
+
+
+async def _cleanup_snapshots(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Delete a room's snapshot files that no journal entry refers to."""
+    room_id = data["room_id"]
+    dry_run = data.get("dry_run", True)
     
-    _LOGGER.info("Retrieved %d journal entries for room %s", len(recent_entries), room_id)
+    refs = get_snapshot_refs(hass, room_id)
+    result = await hass.async_add_executor_job(refs.collect, SNAPSHOT_GC_GRACE, dry_run)
+    return {"room_id": room_id, "dry_run": dry_run, **result}
+
+
+async def _build_timelapse(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Build an animated GIF and a contact sheet from a room's snapshots.
+    
+    The snapshots are taken from the journal in order, and the frames are
+    rendered by a process pool from the executor, reporting progress with
+    grow_room_manager_timelapse_progress events. Only one timelapse per room
+    is built at a time.
+    """
+    room_id = data["room_id"]
+    building = hass.data[DOMAIN].setdefault("timelapse_builds", set())
+    if room_id in building:
+        raise HomeAssistantError(f"A timelapse for room {room_id} is already being built")
+    
+    config_path = hass.config.path()
+    image_dir = Path(config_path) / "www" / "grow_logs" / room_id
+    timelapse_dir = Path(config_path) / "www" / "grow_logs" / "timelapse"
+    timestamp_str = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    gif_name = f"{room_id}_timelapse_{timestamp_str}.gif"
+    sheet_name = f"{room_id}_contact_sheet_{timestamp_str}.jpg"
+    
+    def report_progress(done: int, total: int) -> None:
+        # Called from the executor; EventBus.fire is thread safe
+        hass.bus.fire(
+            f"{DOMAIN}_timelapse_progress",
+            {
+                "room_id": room_id,
+                "file": gif_name,
+                "done": done,
+                "total": total,
+                "percent": round(done * 100 / total) if total else 100,
+            },
+        )
+    
+    building.add(room_id)
+    started = time.monotonic()
+    try:
+        frames = await hass.async_add_executor_job(
+            partial(
+                collect_frames,
+                get_journal_store(hass, room_id),
+                image_dir,
+                camera=data.get("camera"),
+                since=_journal_timestamp(data.get("since")),
+                until=_journal_timestamp(data.get("until")),
+                max_frames=data.get("max_frames", 600),
+            )
+        )
+        result = await hass.async_add_executor_job(
+            build_timelapse,
+            frames,
+            timelapse_dir / gif_name,
+            timelapse_dir / sheet_name,
+            data.get("width", 480),
+            data.get("fps", 10),
+            report_progress,
+        )
+    finally:
+        building.discard(room_id)
+    
+    duration = round(time.monotonic() - started, 1)
+    _LOGGER.info(
+        "Built timelapse of %d frames for room %s in %.1fs (%d snapshots skipped)",
+        result.frames, room_id, duration, result.skipped
+    )
+    return {
+        "room_id": room_id,
+        "path": str(timelapse_dir / gif_name),
+        "url": f"/local/grow_logs/timelapse/{gif_name}",
+        "contact_sheet_path": str(timelapse_dir / sheet_name),
+        "contact_sheet_url": f"/local/grow_logs/timelapse/{sheet_name}",
+        "frames": result.frames,
+        "skipped": result.skipped,
+        "size": result.size,
+        "duration": duration,
+    }
+
+
+def _journal_timestamp(value: date | datetime | None) -> str | None:
+    """Convert a query bound to the ISO format journal entries use.
+
+    Entries are stamped with ``dt_util.now()``: local time in Home
+    Assistant's time zone, with its UTC offset. Dates and naive times are
+    taken to be in that time zone too.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        return dt_util.start_of_local_day(value).isoformat()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_local(value).isoformat()
+
+
+def _cursor_position(data: dict[str, Any], default: int | None) -> int | None:
+    """Return the position encoded in a paging cursor, or ``default``."""
+    cursor = data.get("cursor")
+    if cursor is None:
+        return default
+    try:
+        position = int(cursor)
+    except ValueError:
+        raise HomeAssistantError(f"Invalid cursor: {cursor}") from None
+    if position < 0:
+        raise HomeAssistantError(f"Invalid cursor: {cursor}")
+    return position
+
+
+def _project(items: list[dict[str, Any]], fields: list[str] | None) -> list[dict[str, Any]]:
+    """Keep only the requested fields of each item."""
+    if not fields:
+        return items
+    return [{key: item[key] for key in fields if key in item} for item in items]
@@ -0,0 +1,420 @@
+"""Veg batch repository for Grow Room Manager."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    BATCH_SAVE_DELAY,
+    PHASE_CLONE,
+    PHASE_PREVEG,
+    PHASE_EARLY_VEG,
+    PHASE_LATE_VEG,
+    PHASE_MOTHER,
+)
+from .storage import atomic_open, atomic_write, quarantine
+
+_LOGGER = logging.getLogger(__name__)
+
+# Veg stages from least to most advanced
+STAGE_ORDER = (PHASE_CLONE, PHASE_PREVEG, PHASE_EARLY_VEG, PHASE_LATE_VEG, PHASE_MOTHER)
+
+
+def get_batch_repository(hass: HomeAssistant, room_id: str) -> VegBatchRepository:
+    """Return the batch repository for a veg room, creating an empty one."""
+    repos = hass.data.setdefault(DOMAIN, {}).setdefault("veg_batches", {})
+    if room_id not in repos:
+        repos[room_id] = VegBatchRepository()
+    return repos[room_id]
+
+
+def get_batch_archive(hass: HomeAssistant, room_id: str) -> VegBatchArchive:
+    """Return the archive of inactive batches for a veg room."""
+    archives = hass.data.setdefault(DOMAIN, {}).setdefault("batch_archives", {})
+    if room_id not in archives:
+        archives[room_id] = VegBatchArchive(
+            Path(hass.config.path()) / "grow_logs" / "archive", room_id
+        )
+    return archives[room_id]
+
+
+def get_batch_writer(hass: HomeAssistant, room_id: str) -> VegBatchWriter:
+    """Return the write-behind saver for a veg room's batches."""
+    writers = hass.data.setdefault(DOMAIN, {}).setdefault("batch_writers", {})
+    if room_id not in writers:
+        writers[room_id] = VegBatchWriter(hass, room_id)
+    return writers[room_id]
+
+
+def batches_path(hass: HomeAssistant, room_id: str) -> Path:
+    """Return the path of a veg room's batch file."""
+    return Path(hass.config.path()) / "grow_logs" / f"{room_id}_batches.json"
+
+
+class VegBatchWriter:
+    """Debounced write-behind persistence for one room's veg batches.
+
+    Changes mark the room dirty and start a short timer. When it fires, the
+    current batches are serialized once and written atomically, keeping the
+    previous file as a backup, so a burst of changes costs one write and a
+    crash never leaves a half-written file. ``async_flush`` writes pending
+    changes immediately and is called on unload and shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant, room_id: str) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self.room_id = room_id
+        self.path = batches_path(hass, room_id)
+        self._dirty = False
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._lock = asyncio.Lock()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Mark the batches dirty and save them after the coalescing window."""
+        self._dirty = True
+        if self._unsub_timer is None:
+            self._unsub_timer = async_call_later(
+                self.hass, BATCH_SAVE_DELAY, self._async_handle_timer
+            )
+
+    async def _async_handle_timer(self, _now: datetime) -> None:
+        """Save the batches when the coalescing window closes."""
+        self._unsub_timer = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write pending changes now."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        async with self._lock:
+            if not self._dirty:
+                return
+            # Serialize in the event loop so the executor never sees batches
+            # that are being changed.
+            payload = json.dumps(get_batch_repository(self.hass, self.room_id).all(), indent=2)
+            self._dirty = False
+            try:
+                await self.hass.async_add_executor_job(self._write, payload)
+            except OSError as err:
+                self._dirty = True
+                _LOGGER.error("Error saving veg batches for %s: %s", self.room_id, err)
+
+    def _write(self, payload: str) -> None:
+        """Atomically replace the batch file, keeping a backup."""
+        atomic_write(self.path, payload, backup=True)
+
+
+class VegBatchRepository:
+    """Veg batches of one room, indexed by batch ID, activity and stage.
+
+    Batches are plain dicts, kept in insertion order. Callers that change a
+    batch in place must call ``reindex`` afterwards so the active set, stage
+    buckets and stage aggregates follow. All indexes are maintained
+    incrementally, and ``revision`` is bumped whenever the aggregates change.
+    """
+
+    def __init__(self, batches: list[dict[str, Any]] | None = None) -> None:
+        """Initialize the repository."""
+        self._batches: dict[str, dict[str, Any]] = {}
+        self._active: dict[str, dict[str, Any]] = {}
+        self._by_stage: dict[str, dict[str, dict[str, Any]]] = {}
+        # Contribution of each active batch to the aggregates: (stage, plants, name)
+        self._indexed: dict[str, tuple[str, int, str]] = {}
+        self._stage_stats: dict[str, dict[str, Any]] = {}
+        self._most_advanced: str | None = None
+        self._summary: dict[str, dict[str, Any]] | None = None
+        self.revision = 0
+        for batch in batches or []:
+            self.add(batch)
+
+    def __len__(self) -> int:
+        """Return the number of batches, active or not."""
+        return len(self._batches)
+
+    def __contains__(self, batch_id: object) -> bool:
+        """Return True if a batch with this ID exists."""
+        return batch_id in self._batches
+
+    def get(self, batch_id: str) -> dict[str, Any] | None:
+        """Return a batch by ID."""
+        return self._batches.get(batch_id)
+
+    def add(self, batch: dict[str, Any]) -> None:
+        """Add a batch, replacing any batch with the same ID."""
+        self._batches[batch["batch_id"]] = batch
+        self.reindex(batch["batch_id"])
+
+    def remove(self, batch_id: str) -> dict[str, Any] | None:
+        """Remove a batch and return it."""
+        self._unindex(batch_id)
+        return self._batches.pop(batch_id, None)
+
+    def reindex(self, batch_id: str) -> None:
+        """Refresh the active set and stage buckets for one batch."""
+        batch = self._batches.get(batch_id)
+        if batch is None or not batch.get("active", True):
+            self._unindex(batch_id)
+            return
+        key = (
+            batch.get("stage", "Unknown"),
+            batch.get("plant_count", 0),
+            batch.get("batch_name", "Unknown"),
+        )
+        self._active[batch_id] = batch
+        self._by_stage.setdefault(key[0], {})[batch_id] = batch
+        old = self._indexed.get(batch_id)
+        if old == key:
+            return
+        if old is not None:
+            self._drop_from_stage(batch_id, key[0])
+        self._indexed[batch_id] = key
+        stats = self._stage_stats.setdefault(key[0], {"count": 0, "plants": 0, "batches": {}})
+        if batch_id not in stats["batches"]:
+            stats["count"] += 1
+        stats["plants"] += key[1]
+        stats["batches"][batch_id] = key[2]
+        self._changed()
+
+    def _unindex(self, batch_id: str) -> None:
+        """Drop a batch from the active set and its stage bucket."""
+        self._active.pop(batch_id, None)
+        if batch_id in self._indexed:
+            self._drop_from_stage(batch_id)
+            self._changed()
+
+    def _drop_from_stage(self, batch_id: str, keep_stage: str | None = None) -> None:
+        """Remove a batch's contribution, keeping it listed under ``keep_stage``."""
+        stage, plants, _name = self._indexed.pop(batch_id)
+        stats = self._stage_stats[stage]
+        stats["plants"] -= plants
+        if stage == keep_stage:
+            return
+        stats["count"] -= 1
+        del stats["batches"][batch_id]
+        bucket = self._by_stage[stage]
+        del bucket[batch_id]
+        if not bucket:
+            del self._by_stage[stage]
+            del self._stage_stats[stage]
+
+    def _changed(self) -> None:
+        """Invalidate derived views after the aggregates changed."""
+        self.revision += 1
+        self._summary = None
+        self._most_advanced = next(
+            (stage for stage in reversed(STAGE_ORDER) if stage in self._stage_stats), None
+        )
+
+    def all(self) -> list[dict[str, Any]]:
+        """Return every batch in insertion order."""
+        return list(self._batches.values())
+
+    def active(self) -> list[dict[str, Any]]:
+        """Return active batches."""
+        return list(self._active.values())
+
+    @property
+    def active_count(self) -> int:
+        """Return the number of active batches."""
+        return len(self._active)
+
+    def by_stage(self) -> dict[str, list[dict[str, Any]]]:
+        """Return active batches grouped by stage."""
+        return {stage: list(bucket.values()) for stage, bucket in self._by_stage.items()}
+
+    @property
+    def total_plants(self) -> int:
+        """Return the number of plants across active batches."""
+        return sum(stats["plants"] for stats in self._stage_stats.values())
+
+    @property
+    def most_advanced_stage(self) -> str | None:
+        """Return the most advanced stage with an active batch."""
+        return self._most_advanced
+
+    def stage_summary(self) -> dict[str, dict[str, Any]]:
+        """Return count, plants and batch names per stage.
+
+        The result is rebuilt only after the aggregates change and must be
+        treated as read-only.
+        """
+        if self._summary is None:
+            self._summary = {
+                stage: {
+                    "count": stats["count"],
+                    "plants": stats["plants"],
+                    "batches": list(stats["batches"].values()),
+                }
+                for stage, stats in self._stage_stats.items()
+            }
+        return self._summary
+
+
+class VegBatchArchive:
+    """Inactive veg batches of one room, kept out of the live batch file.
+
+    Archived batches, stage history included, are stored in one gzipped JSON
+    file per year (``<room>_batches_<year>.json.gz``), with a small index of
+    the batch IDs in each year so pages can be served, and counted, by
+    opening only the years they touch. The year is taken from
+    ``archived_at``, which is set once when a batch is first archived, so
+    re-archiving a batch always lands in the same file and replaces the
+    earlier copy.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, base_dir: Path, room_id: str) -> None:
+        """Initialize the archive."""
+        self.base_dir = base_dir
+        self.room_id = room_id
+        self.index_path = base_dir / f"{room_id}_batches_index.json"
+        self._lock = threading.RLock()
+        self._ids: dict[str, list[str]] | None = None
+
+    def archive(self, batches: list[dict[str, Any]]) -> None:
+        """Add or replace batches in the archive."""
+        by_year: dict[str, list[dict[str, Any]]] = {}
+        for batch in batches:
+            batch.setdefault("archived_at", _inactive_since(batch))
+            by_year.setdefault(batch["archived_at"][:4], []).append(batch)
+        with self._lock:
+            index = self._ensure_index()
+            for year, new in by_year.items():
+                ids = {batch["batch_id"] for batch in new}
+                batches = [b for b in self._read_year(year) if b["batch_id"] not in ids] + new
+                self._write_year(year, batches)
+                index[year] = [batch["batch_id"] for batch in batches]
+            self._write_index(index)
+
+    def find(self, batch_id: str) -> dict[str, Any] | None:
+        """Return an archived batch, searching the newest years first."""
+        with self._lock:
+            index = self._ensure_index()
+            for year in sorted(index, reverse=True):
+                if batch_id not in index[year]:
+                    continue
+                for batch in self._read_year(year):
+                    if batch["batch_id"] == batch_id:
+                        return batch
+        return None
+
+    def remove(self, batch_id: str) -> None:
+        """Drop a batch from the archive, e.g. after it was reactivated."""
+        with self._lock:
+            index = self._ensure_index()
+            for year in sorted(index, reverse=True):
+                if batch_id not in index[year]:
+                    continue
+                kept = [b for b in self._read_year(year) if b["batch_id"] != batch_id]
+                self._write_year(year, kept)
+                index[year] = [batch["batch_id"] for batch in kept]
+                self._write_index(index)
+                return
+
+    def count(self, exclude: frozenset[str] = frozenset()) -> int:
+        """Return the number of archived batches, leaving out ``exclude``."""
+        with self._lock:
+            return sum(
+                _count_ids(ids, exclude) for ids in self._ensure_index().values()
+            )
+
+    def page(
+        self, offset: int, limit: int | None, exclude: frozenset[str] = frozenset()
+    ) -> list[dict[str, Any]]:
+        """Return archived batches, most recently archived first.
+
+        Batches in ``exclude`` are left out before ``offset`` and ``limit``
+        are applied, so pages line up with ``count(exclude)``.
+        """
+        result: list[dict[str, Any]] = []
+        with self._lock:
+            index = self._ensure_index()
+            for year in sorted(index, reverse=True):
+                if limit is not None and len(result) >= limit:
+                    break
+                available = _count_ids(index[year], exclude)
+                if offset >= available:
+                    offset -= available
+                    continue
+                batches = [
+                    b for b in self._read_year(year)[::-1] if b["batch_id"] not in exclude
+                ]
+                end = None if limit is None else offset + limit - len(result)
+                result.extend(batches[offset:end])
+                offset = 0
+        return result
+
+    def _year_path(self, year: str) -> Path:
+        """Return the archive file for a year."""
+        return self.base_dir / f"{self.room_id}_batches_{year}.json.gz"
+
+    def _read_year(self, year: str) -> list[dict[str, Any]]:
+        """Read one year of archived batches."""
+        path = self._year_path(year)
+        try:
+            with gzip.open(path, "rb") as f:
+                batches = json.loads(f.read())
+        except FileNotFoundError:
+            return []
+        except (OSError, EOFError, ValueError) as err:
+            _LOGGER.error(
+                "Could not read batch archive %s, moved it to %s: %s",
+                path, quarantine(path), err,
+            )
+            return []
+        return batches if isinstance(batches, list) else []
+
+    def _write_year(self, year: str, batches: list[dict[str, Any]]) -> None:
+        """Replace one year of archived batches."""
+        with atomic_open(self._year_path(year)) as f:
+            with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+                gz.write(json.dumps(batches, ensure_ascii=False).encode("utf-8"))
+
+    def _ensure_index(self) -> dict[str, list[str]]:
+        """Load the per-year batch IDs, rebuilding them if missing or damaged."""
+        if self._ids is not None:
+            return self._ids
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)["ids"]
+        except (OSError, ValueError, KeyError, TypeError):
+            index = {}
+            for path in self.base_dir.glob(f"{self.room_id}_batches_*.json.gz"):
+                year = path.name[len(self.room_id) + len("_batches_"):-len(".json.gz")]
+                index[year] = [batch["batch_id"] for batch in self._read_year(year)]
+            if index:
+                self._write_index(index)
+        self._ids = index
+        return index
+
+    def _write_index(self, index: dict[str, list[str]]) -> None:
+        """Persist the per-year batch IDs."""
+        atomic_write(self.index_path, json.dumps({"ids": index}))
+
+
+def _count_ids(ids: list[str], exclude: frozenset[str]) -> int:
+    """Return how many of ``ids`` are not in ``exclude``."""
+    if not exclude:
+        return len(ids)
+    return sum(1 for batch_id in ids if batch_id not in exclude)
+
+
+def _inactive_since(batch: dict[str, Any]) -> str:
+    """Return when a batch left the room, for batches archived before tracking."""
+    moved = batch.get("moved_to_flower") or {}
+    return moved.get("date") or batch.get("updated_at") or dt_util.now().isoformat()
@@ -37,6 +37,15 @@ VEG_STAGE_DURATIONS: Final = {
     PHASE_MOTHER: 0,      # Indefinite
 }
 
+# Day offset into VEG_SCHEDULE for a batch entering each stage
+VEG_STAGE_OFFSETS: Final = {
+    PHASE_CLONE: 0,
+    PHASE_PREVEG: 14,
+    PHASE_EARLY_VEG: 21,
+    PHASE_LATE_VEG: 35,
+    PHASE_MOTHER: 0,  # Mother has its own schedule
+}
+
 # EC targets by phase
 EC_STRETCH: Final = 3.0
 EC_BULK: Final = 3.0
@@ -59,6 +68,35 @@ SERVICE_UPDATE_VEG_BATCH: Final = "update_veg_batch"
 SERVICE_MOVE_TO_FLOWER: Final = "move_to_flower"
 SERVICE_LIST_VEG_BATCHES: Final = "list_veg_batches"
 SERVICE_GET_JOURNAL: Final = "get_journal"
+SERVICE_SEARCH_JOURNAL: Final = "search_journal"
+SERVICE_CLEANUP_SNAPSHOTS: Final = "cleanup_snapshots"
+SERVICE_BUILD_TIMELAPSE: Final = "build_timelapse"
+
+# Dispatcher signals, formatted with the room ID
+SIGNAL_JOURNAL_UPDATED: Final = "grow_room_manager_journal_updated_{}"
+SIGNAL_VEG_BATCHES_UPDATED: Final = "grow_room_manager_veg_batches_updated_{}"
+
+# Maximum calendar/todo service calls in flight while generating tasks
+DEFAULT_TASK_CONCURRENCY: Final = 8
+
+# Seconds to wait for each camera when taking journal snapshots
+SNAPSHOT_TIMEOUT: Final = 10
+
+# Seconds a new snapshot file is safe from cleanup before its entry is saved
+SNAPSHOT_GC_GRACE: Final = 3600
+
+# Journal entries rendered in the journal sensor's markdown attribute
+JOURNAL_RENDER_ENTRIES: Final = 10
+
+# Veg batches per event when list_veg_batches is called without a response
+# and without a limit; the event carries next_cursor for the rest
+VEG_BATCH_EVENT_LIMIT: Final = 50
+
+# Full journal exports kept per room and format; older exports are pruned
+DEFAULT_EXPORT_RETENTION: Final = 5
+
+# Seconds to coalesce veg batch changes into a single write
+BATCH_SAVE_DELAY: Final = 2
 
 # Veg EC targets by stage
 EC_CLONE: Final = 0.8
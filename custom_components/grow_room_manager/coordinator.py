@@ -0,0 +1,192 @@
+"""Room data coordinator for Grow Room Manager."""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_ROOM_ID,
+    CONF_START_DATE,
+    CONF_START_DATE_ENTITY,
+    PHASE_STRETCH,
+    PHASE_BULK,
+    PHASE_FINISH,
+    EC_STRETCH,
+    EC_BULK,
+    EC_FINISH,
+    DRYBACK_STRETCH,
+    DRYBACK_BULK,
+    DRYBACK_FINISH,
+)
+from .schedule import ATHENA_INDEX
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrowRoomCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Compute the snapshot of a flower room once for all of its sensors.
+
+    The grow day only changes at local midnight or when the start date
+    changes, so there is no polling. The snapshot is refreshed at midnight,
+    when the start date entity changes to a different date and when the
+    config entry's start date changes.
+
+    The current date is taken in Home Assistant's time zone, the same one
+    the midnight trigger fires in, not the host's.
+
+    The start date entity is read and parsed once at setup and afterwards
+    only from its state change events, so refreshes never touch the state
+    machine or parse strings.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        self.entry = entry
+        self.room_id = entry.data[CONF_ROOM_ID]
+        self._start_date_entity: str | None = entry.data.get(CONF_START_DATE_ENTITY) or None
+        self._config_start_date = parse_start_date(entry.data.get(CONF_START_DATE))
+        self._entity_start_date: date | None = None
+        if self._start_date_entity:
+            self._entity_start_date = _parse_state(hass.states.get(self._start_date_entity))
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{self.room_id}",
+            update_interval=None,
+            always_update=False,
+        )
+
+    @property
+    def start_date(self) -> date | None:
+        """Return the effective start date, preferring the start date entity."""
+        return self._entity_start_date or self._config_start_date
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the events that can change the snapshot."""
+        entry = self.entry
+        entry.async_on_unload(
+            async_track_time_change(
+                self.hass, self._async_handle_midnight, hour=0, minute=0, second=0
+            )
+        )
+        if self._start_date_entity:
+            entry.async_on_unload(
+                async_track_state_change_event(
+                    self.hass, [self._start_date_entity], self._async_handle_start_date_change
+                )
+            )
+        entry.async_on_unload(entry.add_update_listener(self._async_handle_entry_update))
+
+    async def _async_handle_midnight(self, now: datetime) -> None:
+        """Roll the room over to the next grow day."""
+        await self.async_refresh()
+
+    async def _async_handle_start_date_change(self, event: Event) -> None:
+        """Refresh when the start date entity moves to a different date."""
+        new_date = _parse_state(event.data.get("new_state"))
+        if new_date == self._entity_start_date:
+            return
+        self._entity_start_date = new_date
+        await self.async_refresh()
+
+    async def _async_handle_entry_update(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Refresh when the config entry's start date changes."""
+        await self.async_set_start_date(parse_start_date(entry.data.get(CONF_START_DATE)))
+
+    async def async_set_start_date(self, start_date: date | None) -> None:
+        """Apply a new configured start date without reloading the entry."""
+        if start_date == self._config_start_date:
+            return
+        self._config_start_date = start_date
+        await self.async_refresh()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Build the room snapshot."""
+        return build_room_snapshot(self.start_date, dt_util.now().date())
+
+
+def _parse_state(state: State | None) -> date | None:
+    """Parse a date from a start date entity state."""
+    if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE, None, ""):
+        return None
+    parsed = parse_start_date(state.state)
+    if parsed is None:
+        _LOGGER.debug("Could not parse date from entity %s", state.entity_id)
+    return parsed
+
+
+def parse_start_date(value: Any) -> date | None:
+    """Parse a start date from a date, ISO date or ISO datetime string."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        date_str = str(value)
+        if "T" in date_str:
+            date_str = date_str.split("T")[0]
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (ValueError, AttributeError):
+        return None
+
+
+def build_room_snapshot(start_date: date | None, today: date) -> dict[str, Any]:
+    """Return start date, day, week, phase, progress and next task for a room."""
+    snapshot: dict[str, Any] = {
+        "start_date": start_date,
+        "current_day": None,
+        "week": None,
+        "phase": "Not Started",
+        "recommended_ec": None,
+        "target_dryback": None,
+        "progress": 0,
+        "next_task": None,
+    }
+    if start_date is None:
+        return snapshot
+
+    day = (today - start_date).days + 1
+    if day < 1:
+        return snapshot
+
+    snapshot["current_day"] = day
+    snapshot["week"] = ((day - 1) // 7) + 1
+    snapshot["phase"], snapshot["recommended_ec"], snapshot["target_dryback"] = _calculate_phase(day)
+    # Progress based on 84-day cycle
+    snapshot["progress"] = min(100, int((day / 84) * 100))
+
+    found = ATHENA_INDEX.next_task(day)
+    if found:
+        task_day, task_info = found
+        snapshot["next_task"] = {
+            "title": task_info["title"],
+            "day": task_day,
+            "date": start_date + timedelta(days=task_day - 1),
+            "priority": task_info.get("priority", "medium"),
+            "days_until": task_day - day,
+        }
+
+    return snapshot
+
+
+def _calculate_phase(day: int) -> tuple[str, float, str]:
+    """Calculate the current phase based on day number."""
+    if day <= 21:
+        return PHASE_STRETCH, EC_STRETCH, DRYBACK_STRETCH
+    elif day <= 55:
+        return PHASE_BULK, EC_BULK, DRYBACK_BULK
+    else:
+        return PHASE_FINISH, EC_FINISH, DRYBACK_FINISH
@@ -0,0 +1,255 @@
+"""Streaming journal export for Grow Room Manager."""
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import logging
+import re
+import time
+import zipfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+from .journal import JournalStore
+from .storage import CorruptFileError, atomic_open, atomic_write, load_json
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_CSV = "csv"
+EXPORT_JSON = "json"
+EXPORT_CSV_GZ = "csv.gz"
+EXPORT_JSONL_GZ = "jsonl.gz"
+EXPORT_ZIP = "zip"
+
+EXPORT_FORMATS = [EXPORT_CSV, EXPORT_JSON, EXPORT_CSV_GZ, EXPORT_JSONL_GZ, EXPORT_ZIP]
+
+CSV_FIELDS = ["timestamp", "note", "image_url"]
+
+# Suffix of exports that only hold entries added since the previous export
+INCREMENTAL_SUFFIX = "_incremental"
+
+# Minimum seconds between progress reports
+PROGRESS_INTERVAL = 1.0
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportResult(NamedTuple):
+    """Summary of a finished export."""
+
+    entries: int
+    images: int
+    size: int
+
+
+def export_journal(
+    store: JournalStore,
+    path: Path,
+    export_format: str,
+    image_dir: Path,
+    progress: ProgressCallback | None = None,
+    start: int = 0,
+    end: int | None = None,
+) -> ExportResult:
+    """Write a room's journal to ``path``, one entry at a time.
+
+    Entries at positions ``start`` to ``end`` (default: all) are streamed
+    from the journal straight into the (optionally compressed) output, so
+    memory use does not grow with the journal. The file appears at ``path``
+    only once it is complete. ``progress`` is called with (entries written,
+    total entries) at most once per ``PROGRESS_INTERVAL`` and once at the end.
+
+    Blocking; must run in the executor.
+    """
+    if end is None:
+        end = store.count()
+    tracker = _Progress(store, start, end, progress)
+    images = 0
+    with atomic_open(path, durable=False) as f:
+        if export_format == EXPORT_ZIP:
+            images = _write_zip(f, image_dir, tracker)
+        elif export_format == EXPORT_CSV_GZ:
+            with _gzip_text(f) as text:
+                _write_csv(text, tracker)
+        elif export_format == EXPORT_JSONL_GZ:
+            with _gzip_text(f) as text:
+                _write_jsonl(text, tracker)
+        elif export_format == EXPORT_JSON:
+            with _text(f) as text:
+                _write_json(text, tracker)
+        else:
+            with _text(f) as text:
+                _write_csv(text, tracker)
+    tracker.finish()
+    return ExportResult(tracker.written, images, path.stat().st_size)
+
+
+class _Progress:
+    """Count written entries and report progress, throttled."""
+
+    def __init__(
+        self, store: JournalStore, start: int, end: int, callback: ProgressCallback | None
+    ) -> None:
+        self.store = store
+        self.start = start
+        self.total = max(0, end - start)
+        self.written = 0
+        self._callback = callback
+        self._last = time.monotonic()
+
+    def selected(self) -> Iterator[dict[str, Any]]:
+        """Yield the exported entries without counting them."""
+        return islice(self.store.iter_entries(self.start), self.total)
+
+    def entries(self) -> Iterator[dict[str, Any]]:
+        """Yield the exported entries, counting them."""
+        for entry in self.selected():
+            yield entry
+            self.written += 1
+            if self._callback and time.monotonic() - self._last >= PROGRESS_INTERVAL:
+                self._last = time.monotonic()
+                self._callback(self.written, self.total)
+
+    def finish(self) -> None:
+        """Report completion."""
+        if self._callback:
+            self._callback(self.written, self.total)
+
+
+@contextmanager
+def _text(f: IO[bytes]) -> Iterator[IO[str]]:
+    """Wrap a binary file for UTF-8 text, leaving it open on exit."""
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+
+
+@contextmanager
+def _gzip_text(f: IO[bytes]) -> Iterator[IO[str]]:
+    """Wrap a binary file for gzipped UTF-8 text."""
+    with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz, _text(gz) as text:
+        yield text
+
+
+def _write_csv(text: IO[str], tracker: _Progress) -> None:
+    """Write entries as CSV."""
+    writer = csv.DictWriter(text, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for entry in tracker.entries():
+        writer.writerow({field: entry.get(field) or "" for field in CSV_FIELDS})
+
+
+def _write_jsonl(text: IO[str], tracker: _Progress) -> None:
+    """Write entries as JSON lines."""
+    for entry in tracker.entries():
+        text.write(json.dumps(entry, ensure_ascii=False))
+        text.write("\n")
+
+
+def _write_json(text: IO[str], tracker: _Progress) -> None:
+    """Write entries as a JSON array without holding them all in memory."""
+    text.write("[")
+    for entry in tracker.entries():
+        text.write(",\n  " if tracker.written else "\n  ")
+        text.write(json.dumps(entry, ensure_ascii=False))
+    text.write("\n]\n" if tracker.written else "]\n")
+
+
+def _write_zip(f: IO[bytes], image_dir: Path, tracker: _Progress) -> int:
+    """Write a zip with the journal as JSON lines and the snapshots it refers to.
+
+    The journal is streamed twice, once for the entries and once for the
+    images, so no list of entries is kept in memory. Snapshots are
+    only taken from the room's own image directory and are stored without
+    recompression since they are already JPEG.
+    """
+    added: set[str] = set()
+    with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("journal.jsonl", "w") as member, _text(member) as text:
+            for entry in tracker.entries():
+                files = [f"images/{image.name}" for image in _snapshot_paths(entry, image_dir)]
+                if files:
+                    entry = {**entry, "image_file": files[0], "image_files": files}
+                text.write(json.dumps(entry, ensure_ascii=False))
+                text.write("\n")
+        for entry in tracker.selected():
+            for image in _snapshot_paths(entry, image_dir):
+                if image.name not in added:
+                    zf.write(image, f"images/{image.name}", compress_type=zipfile.ZIP_STORED)
+                    added.add(image.name)
+    return len(added)
+
+
+def _snapshot_paths(entry: dict[str, Any], image_dir: Path) -> list[Path]:
+    """Return the snapshot files of an entry that exist in the room's image directory."""
+    image_paths = [image.get("image_path") for image in entry.get("images") or [entry]]
+    paths = [image_dir / Path(image_path).name for image_path in image_paths if image_path]
+    return [path for path in paths if path.is_file()]
+
+
+def export_filename(room_id: str, export_format: str, incremental: bool) -> str:
+    """Return the name of a new export file."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    suffix = INCREMENTAL_SUFFIX if incremental else ""
+    return f"{room_id}_export_{timestamp}{suffix}.{export_format}"
+
+
+def load_checkpoints(path: Path) -> dict[str, Any]:
+    """Return the export checkpoints of a room, keyed by format."""
+    try:
+        return load_json(path, dict)
+    except CorruptFileError as err:
+        # Without a checkpoint the next export is simply a full one
+        _LOGGER.warning("Export checkpoint lost, next export will be full: %s", err)
+        return {}
+
+
+def save_checkpoint(
+    path: Path, export_format: str, position: int, filename: str, full: bool
+) -> None:
+    """Record that entries up to ``position`` were exported in ``export_format``."""
+    checkpoints = load_checkpoints(path)
+    checkpoints[export_format] = {
+        "position": position,
+        "file": filename,
+        "full": full,
+        "exported_at": datetime.now().isoformat(),
+    }
+    atomic_write(path, json.dumps(checkpoints, indent=2))
+
+
+def prune_exports(directory: Path, room_id: str, export_format: str, keep_full: int) -> list[Path]:
+    """Delete old exports of a room in one format, returning the removed files.
+
+    The newest ``keep_full`` full exports are kept together with every
+    incremental export made after the oldest of them, so each kept file can
+    still be restored from a full export plus the incrementals that follow
+    it. Everything older is removed.
+    """
+    pattern = re.compile(
+        rf"{re.escape(room_id)}_export_(\d{{8}}_\d{{6}})({INCREMENTAL_SUFFIX})?"
+        rf"{re.escape('.' + export_format)}"
+    )
+    exports: list[tuple[str, bool, Path]] = []
+    for path in directory.glob(f"{room_id}_export_*"):
+        if match := pattern.fullmatch(path.name):
+            exports.append((match[1], match[2] is None, path))
+    full_times = sorted(stamp for stamp, full, _path in exports if full)
+    if keep_full <= 0 or len(full_times) <= keep_full:
+        return []
+    oldest_kept = full_times[-keep_full]
+    removed = []
+    for stamp, _full, path in exports:
+        if stamp < oldest_kept:
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
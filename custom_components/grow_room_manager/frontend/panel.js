@@ -3,6 +3,15 @@
  * Standalone UI accessible from Home Assistant sidebar
  */
 
+const JOURNAL_SENSORS = {
+  f1: 'sensor.flower_room_1_journal_entries',
+  f2: 'sensor.flower_room_2_journal_entries',
+  f3: 'sensor.flower_room_3_journal_entries',
+  veg: 'sensor.veg_room_journal_entries',
+};
+
+const JOURNAL_LIST_LIMIT = 20;
+
 class GrowRoomPanel extends HTMLElement {
   constructor() {
     super();
@@ -11,6 +20,7 @@ class GrowRoomPanel extends HTMLElement {
     this._rooms = {};
     this._vegBatches = [];
     this._journal = {};
+    this._journalRoom = 'f1';
   }
 
   set hass(hass) {
@@ -223,6 +233,17 @@ class GrowRoomPanel extends HTMLElement {
         font-size: 12px;
         margin-bottom: 5px;
       }
+      .journal-photos {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 8px;
+      }
+      .journal-thumb {
+        display: block;
+        max-width: 160px;
+        margin-top: 8px;
+        border-radius: 6px;
+      }
       .quick-btns {
         display: flex;
         flex-wrap: wrap;
@@ -685,10 +706,9 @@ class GrowRoomPanel extends HTMLElement {
       <h1>📝 Journal</h1>
 
       <div class="tabs">
-        <div class="tab active" data-journal-room="f1">F1</div>
-        <div class="tab" data-journal-room="f2">F2</div>
-        <div class="tab" data-journal-room="f3">F3</div>
-        <div class="tab" data-journal-room="veg">Veg</div>
+        ${['f1', 'f2', 'f3', 'veg'].map(id => `
+          <div class="tab ${id === this._journalRoom ? 'active' : ''}" data-journal-room="${id}">${id === 'veg' ? 'Veg' : id.toUpperCase()}</div>
+        `).join('')}
       </div>
 
       <div class="card">
@@ -706,9 +726,7 @@ class GrowRoomPanel extends HTMLElement {
       </div>
 
       <h2>📖 Recent Entries</h2>
-      <div id="journal-entries">
-        <p style="color: var(--text-secondary)">Select a room tab to view entries. Entries are stored in /config/grow_logs/</p>
-      </div>
+      <div id="journal-entries">${this._renderJournalEntries(this._journalRoom)}</div>
 
       <h2>📤 Export</h2>
       <div class="quick-btns">
@@ -720,6 +738,42 @@ class GrowRoomPanel extends HTMLElement {
     `;
   }
 
+  _renderJournalEntries(roomId) {
+    const cached = this._journal[roomId];
+    if (!cached) {
+      return '<p style="color: var(--text-secondary)">Loading entries...</p>';
+    }
+    if (cached.error) {
+      return `<p style="color: var(--text-secondary)">❌ ${this._escape(cached.error)}</p>`;
+    }
+    if (!cached.entries.length) {
+      return '<p style="color: var(--text-secondary)">No journal entries yet.</p>';
+    }
+    // Thumbnails keep the list light; the full snapshot opens on click
+    return cached.entries.map(entry => {
+      // One snapshot per camera; older entries only have the top-level URLs
+      const photos = (entry.images?.length ? entry.images : [entry]).map(photo => {
+        if (photo.thumb_url) {
+          return `<a href="${photo.image_url}" target="_blank"><img class="journal-thumb" src="${photo.thumb_url}" loading="lazy" alt="Snapshot"></a>`;
+        }
+        return photo.image_url ? `<a href="${photo.image_url}" target="_blank">📷 View Photo</a>` : '';
+      }).join('');
+      return `
+        <div class="journal-entry">
+          <div class="journal-date">${(entry.timestamp || '').slice(0, 16).replace('T', ' ')}</div>
+          <div>${this._escape(entry.note || '')}</div>
+          <div class="journal-photos">${photos}</div>
+        </div>
+      `;
+    }).join('');
+  }
+
+  _escape(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+  }
+
   _renderFeeding() {
     return `
       <h1>🧪 Feeding Calculator</h1>
@@ -1035,8 +1089,16 @@ class GrowRoomPanel extends HTMLElement {
       tab.addEventListener('click', (e) => {
         this.shadowRoot.querySelectorAll('.tab[data-journal-room]').forEach(t => t.classList.remove('active'));
         e.target.classList.add('active');
+        this._journalRoom = e.target.dataset.journalRoom;
+        const list = this.shadowRoot.getElementById('journal-entries');
+        if (list) list.innerHTML = this._renderJournalEntries(this._journalRoom);
+        this._loadJournal(this._journalRoom);
       });
     });
+
+    if (this.shadowRoot.getElementById('journal-entries')) {
+      this._loadJournal(this._journalRoom);
+    }
   }
 
 
@@ -1053,6 +1115,30 @@ class GrowRoomPanel extends HTMLElement {
     }
   }
 
+  async _loadJournal(roomId) {
+    // Only fetch when the room's entry count changed since the last fetch
+    const count = this._hass?.states[JOURNAL_SENSORS[roomId]]?.state;
+    const cached = this._journal[roomId];
+    if (this._journalLoading === roomId || (cached && cached.count === count)) return;
+    this._journalLoading = roomId;
+    try {
+      const result = await this._hass.callService('grow_room_manager', 'get_journal', {
+        room_id: roomId,
+        limit: JOURNAL_LIST_LIMIT,
+        fields: ['timestamp', 'note', 'image_url', 'thumb_url', 'images']
+      }, undefined, false, true);
+      this._journal[roomId] = { count, entries: result?.response?.entries || [] };
+    } catch (err) {
+      this._journal[roomId] = { count, entries: [], error: err.message };
+    } finally {
+      this._journalLoading = null;
+    }
+    const list = this.shadowRoot.getElementById('journal-entries');
+    if (list && this._journalRoom === roomId) {
+      list.innerHTML = this._renderJournalEntries(roomId);
+    }
+  }
+
   async _setStartDate(roomId) {
     const today = new Date().toISOString().split('T')[0];
     try {
@@ -0,0 +1,318 @@
+"""Append-only journal storage for Grow Room Manager."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .storage import atomic_open, atomic_write, load_json
+
+_LOGGER = logging.getLogger(__name__)
+
+JOURNAL_FORMAT_VERSION = 1
+
+# Record the byte offset of every Nth entry in the sidecar so reads can seek
+# close to any entry without scanning the whole journal.
+INDEX_STRIDE = 128
+
+
+class JournalSummary(NamedTuple):
+    """Entry count and last entry of a journal at a given file signature."""
+
+    count: int
+    last_entry: dict[str, Any] | None
+    signature: tuple[int, int] | None
+
+
+class JournalPage(NamedTuple):
+    """One page of a journal query, most recent entry first."""
+
+    entries: list[dict[str, Any]]
+    total: int
+    next_cursor: int | None
+
+
+def get_journal_store(hass: HomeAssistant, room_id: str) -> JournalStore:
+    """Return the shared journal store for a room."""
+    stores = hass.data.setdefault(DOMAIN, {}).setdefault("journals", {})
+    if room_id not in stores:
+        stores[room_id] = JournalStore(Path(hass.config.path()) / "grow_logs", room_id)
+    return stores[room_id]
+
+
+class JournalStore:
+    """Journal for one room stored as JSON lines plus a small sidecar.
+
+    Entries live in ``<room>.jsonl``, one JSON object per line. The sidecar
+    ``<room>.meta.json`` holds the entry count, the size of the data file when
+    the sidecar was written, the offset of the last entry and a sparse offset
+    index. A sidecar that does not match the data file is rebuilt by scanning.
+    Legacy ``<room>.json`` arrays are migrated on first use.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, base_dir: Path, room_id: str) -> None:
+        """Initialize the store."""
+        self.room_id = room_id
+        self.path = base_dir / f"{room_id}.jsonl"
+        self.meta_path = base_dir / f"{room_id}.meta.json"
+        self.legacy_path = base_dir / f"{room_id}.json"
+        self._lock = threading.RLock()
+        self._meta: dict[str, Any] | None = None
+        self._summary: JournalSummary | None = None
+
+    def append(self, entry: dict[str, Any]) -> int:
+        """Append a single entry to the journal and return its position."""
+        line = json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._lock:
+            meta = self._ensure_meta()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                if offset != meta["size"]:
+                    # The file changed outside this store since it was indexed
+                    _LOGGER.debug("Journal %s changed on disk, rebuilding index", self.room_id)
+                    meta = self._meta = self._rebuild_meta()
+                    offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            self._record(meta, offset, len(line), entry)
+            self._write_meta(meta)
+            self._summary = JournalSummary(meta["count"], entry, self.signature())
+            return meta["count"] - 1
+
+    def count(self) -> int:
+        """Return the number of entries."""
+        return self.summary().count
+
+    def last_entry(self) -> dict[str, Any] | None:
+        """Return the most recent entry without reading the whole file."""
+        return self.summary().last_entry
+
+    def signature(self) -> tuple[int, int] | None:
+        """Return the (mtime_ns, size) of the data file, or None if missing."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def summary(self) -> JournalSummary:
+        """Return the entry count and last entry.
+
+        The result is memoized on the data file signature, so repeated calls
+        cost a single ``stat`` until the journal changes. A change made outside
+        this store invalidates the cached sidecar as well.
+        """
+        with self._lock:
+            sig = self.signature()
+            if self._summary is not None and self._summary.signature == sig:
+                return self._summary
+
+            if self._meta is not None and self._meta["size"] != (sig[1] if sig else 0):
+                self._meta = None
+            meta = self._ensure_meta()
+            last = None
+            if meta["count"]:
+                with open(self.path, "rb") as f:
+                    f.seek(meta["last_offset"])
+                    last = _decode(f.readline())
+            self._summary = JournalSummary(meta["count"], last, self.signature())
+            return self._summary
+
+    def read_all(self) -> list[dict[str, Any]]:
+        """Return every entry, oldest first."""
+        return list(self.iter_entries())
+
+    def iter_entries(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        """Yield entries from position ``start`` onwards, oldest first."""
+        with self._lock:
+            meta = self._ensure_meta()
+            if start >= meta["count"]:
+                return
+            slot = max(0, start) // INDEX_STRIDE
+            offset = meta["index"][slot][0]
+            skip = max(0, start) - slot * INDEX_STRIDE
+            end = meta["size"]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while f.tell() < end:
+                line = f.readline()
+                if not line.strip():
+                    continue
+                entry = _decode(line)
+                if entry is None:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                yield entry
+
+    def tail(self, limit: int) -> list[dict[str, Any]]:
+        """Return the last ``limit`` entries, oldest first."""
+        with self._lock:
+            total = self._ensure_meta()["count"]
+        return list(self.iter_entries(max(0, total - limit)))
+
+    def query(
+        self,
+        since: str | None = None,
+        until: str | None = None,
+        cursor: int | None = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> JournalPage:
+        """Return a page of entries in a timestamp range, most recent first.
+
+        ``since`` is inclusive and ``until`` exclusive; both are ISO strings
+        compared with the entry timestamps. Entries are appended in time
+        order, so the range bounds are found by bisecting the sparse index
+        and scanning at most one stride, and only the requested slice is
+        read. ``offset`` skips the most recent matching entries. ``cursor``
+        is the ``next_cursor`` of a previous page: the position of the oldest
+        entry returned so far, which stays valid while entries are appended.
+        """
+        with self._lock:
+            meta = self._ensure_meta()
+            lo = self._lower_bound(meta, since) if since else 0
+            hi = self._lower_bound(meta, until) if until else meta["count"]
+        hi = max(lo, hi)
+        end = hi - offset if cursor is None else min(cursor, hi)
+        end = max(lo, end)
+        start = max(lo, end - limit)
+        entries = list(islice(self.iter_entries(start), end - start))
+        entries.reverse()
+        return JournalPage(entries, hi - lo, start if start > lo else None)
+
+    def _lower_bound(self, meta: dict[str, Any], timestamp: str) -> int:
+        """Return the position of the first entry at or after ``timestamp``."""
+        keys = [ts or "" for _offset, ts in meta["index"]]
+        slot = max(0, bisect_left(keys, timestamp) - 1)
+        position = slot * INDEX_STRIDE
+        for entry in self.iter_entries(position):
+            if (entry.get("timestamp") or "") >= timestamp:
+                break
+            position += 1
+        return position
+
+    def _ensure_meta(self) -> dict[str, Any]:
+        """Load, validate or rebuild the sidecar."""
+        if self._meta is not None:
+            return self._meta
+
+        if not self.path.exists() and self.legacy_path.exists():
+            self._migrate_legacy()
+
+        meta = self._read_meta()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if meta is None or meta.get("size") != size:
+            meta = self._rebuild_meta()
+            self._write_meta(meta)
+        self._meta = meta
+        return meta
+
+    def _read_meta(self) -> dict[str, Any] | None:
+        """Read the sidecar if it is present and understood."""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as err:
+            _LOGGER.warning("Journal index for %s unreadable, rebuilding: %s", self.room_id, err)
+            return None
+        if meta.get("version") != JOURNAL_FORMAT_VERSION:
+            return None
+        return meta
+
+    def _rebuild_meta(self) -> dict[str, Any]:
+        """Scan the data file and build a fresh sidecar."""
+        meta = _empty_meta()
+        if not self.path.exists():
+            return meta
+        with open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                entry = _decode(line)
+                if entry is None:
+                    meta["size"] = f.tell()
+                    continue
+                self._record(meta, offset, len(line), entry)
+            torn = meta["size"] > 0 and not _line_ended(f, meta["size"])
+        if torn:
+            # Terminate a partially written last line so the next append
+            # starts on a fresh line instead of merging into it.
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+            meta["size"] = self.path.stat().st_size
+        _LOGGER.debug("Rebuilt journal index for %s (%d entries)", self.room_id, meta["count"])
+        return meta
+
+    @staticmethod
+    def _record(meta: dict[str, Any], offset: int, length: int, entry: dict[str, Any]) -> None:
+        """Account for an entry written at ``offset``."""
+        if meta["count"] % INDEX_STRIDE == 0:
+            meta["index"].append([offset, entry.get("timestamp")])
+        meta["count"] += 1
+        meta["last_offset"] = offset
+        meta["size"] = offset + length
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        """Persist the sidecar.
+
+        The sidecar can always be rebuilt from the data file, so it is
+        replaced atomically but without the cost of an fsync per append.
+        """
+        atomic_write(self.meta_path, json.dumps(meta), durable=False)
+
+    def _migrate_legacy(self) -> None:
+        """Convert a legacy JSON array journal to JSON lines.
+
+        A legacy journal that cannot be parsed is moved aside and
+        ``CorruptFileError`` is raised so the caller can report it.
+        """
+        entries = load_json(self.legacy_path, list)
+
+        with atomic_open(self.path) as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.legacy_path.rename(self.legacy_path.with_suffix(".json.migrated"))
+        _LOGGER.info("Migrated %d journal entries for %s to JSON lines", len(entries), self.room_id)
+
+
+def _empty_meta() -> dict[str, Any]:
+    """Return the sidecar for an empty journal."""
+    return {
+        "version": JOURNAL_FORMAT_VERSION,
+        "count": 0,
+        "size": 0,
+        "last_offset": 0,
+        "index": [],
+    }
+
+
+def _line_ended(f: Any, size: int) -> bool:
+    """Return True if the byte before ``size`` in ``f`` is a newline."""
+    f.seek(size - 1)
+    return f.read(1) == b"\n"
+
+
+def _decode(line: bytes) -> dict[str, Any] | None:
+    """Decode one journal line, skipping torn or invalid lines."""
+    try:
+        entry = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return entry if isinstance(entry, dict) else None
@@ -0,0 +1,94 @@
+"""Markdown rendering of recent journal entries for Grow Room Manager."""
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import Any
+
+from .journal import JournalStore
+
+ENTRY_SEPARATOR = "\n\n---\n\n"
+
+
+def format_entry(entry: dict[str, Any]) -> str:
+    """Format one journal entry as markdown."""
+    ts = entry.get("timestamp") or "Unknown"
+    try:
+        ts_formatted = datetime.fromisoformat(ts).strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        ts_formatted = ts[:16]
+
+    line = f"**{ts_formatted}**\n{entry.get('note', '')}"
+    for photo in entry_photos(entry):
+        if photo.get("thumb_url"):
+            # Show the thumbnail, linking to the full snapshot
+            line += f"\n[![Photo]({photo['thumb_url']})]({photo['image_url']})"
+        else:
+            line += f"\n📷 [View Photo]({photo['image_url']})"
+    return line
+
+
+def entry_photos(entry: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the snapshots of an entry, one per camera.
+
+    Entries from before multi-camera support only have the top-level
+    ``image_url`` and ``thumb_url``.
+    """
+    if entry.get("images"):
+        return [image for image in entry["images"] if image.get("image_url")]
+    return [entry] if entry.get("image_url") else []
+
+
+class JournalRenderer:
+    """Render the most recent entries of a journal as markdown, cached.
+
+    The result is kept until the journal file changes. Formatted entries are
+    kept by position, and the journal is append-only, so after an append only
+    the new entries are read and formatted. If the journal shrinks (it was
+    replaced or truncated), the cache is dropped.
+
+    ``render`` does blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, store: JournalStore, limit: int) -> None:
+        """Initialize the renderer."""
+        self.store = store
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._formatted: dict[int, str] = {}
+        self._count = 0
+        self._signature: tuple[int, int] | None = None
+        self._markdown: str | None = None
+
+    def render(self) -> str:
+        """Return the newest entries as markdown, newest first."""
+        with self._lock:
+            signature = self.store.signature()
+            if self._markdown is not None and signature == self._signature:
+                return self._markdown
+
+            total = self.store.count()
+            if total < self._count:
+                self._formatted.clear()
+            start = max(0, total - self.limit)
+            missing = [position for position in range(start, total) if position not in self._formatted]
+            if missing:
+                first = missing[0]
+                for position, entry in enumerate(
+                    islice(self.store.iter_entries(first), total - first), first
+                ):
+                    if position not in self._formatted:
+                        self._formatted[position] = format_entry(entry)
+            for position in [p for p in self._formatted if p < start]:
+                del self._formatted[position]
+
+            self._count = total
+            self._signature = signature
+            if not total:
+                self._markdown = "No journal entries yet."
+            else:
+                self._markdown = ENTRY_SEPARATOR.join(
+                    self._formatted[position] for position in range(total - 1, start - 1, -1)
+                )
+            return self._markdown
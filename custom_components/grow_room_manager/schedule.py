@@ -0,0 +1,32 @@
+"""Precomputed lookups over the grow schedules."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+from .const import ATHENA_SCHEDULE, VEG_SCHEDULE
+
+
+class ScheduleIndex:
+    """Sorted view of a schedule for O(log n) next-task lookups."""
+
+    def __init__(self, schedule: dict[int, dict[str, Any]]) -> None:
+        """Initialize the index."""
+        self._schedule = schedule
+        self._days = sorted(schedule)
+
+    def next_day(self, day: int) -> int | None:
+        """Return the first scheduled day on or after ``day``."""
+        i = bisect_left(self._days, day)
+        return self._days[i] if i < len(self._days) else None
+
+    def next_task(self, day: int) -> tuple[int, dict[str, Any]] | None:
+        """Return the first scheduled (day, task) on or after ``day``."""
+        task_day = self.next_day(day)
+        if task_day is None:
+            return None
+        return task_day, self._schedule[task_day]
+
+
+ATHENA_INDEX = ScheduleIndex(ATHENA_SCHEDULE)
+VEG_INDEX = ScheduleIndex(VEG_SCHEDULE)
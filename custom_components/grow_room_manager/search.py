@@ -0,0 +1,202 @@
+"""Full-text search over journal notes for Grow Room Manager."""
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+from .journal import JournalStore, get_journal_store
+
+_LOGGER = logging.getLogger(__name__)
+
+SEARCH_SCHEMA_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def get_search_index(hass: HomeAssistant, room_id: str) -> JournalSearchIndex:
+    """Return the shared search index for a room."""
+    indexes = hass.data.setdefault(DOMAIN, {}).setdefault("search_indexes", {})
+    if room_id not in indexes:
+        indexes[room_id] = JournalSearchIndex(
+            Path(hass.config.path()) / "grow_logs" / f"{room_id}.search.sqlite",
+            get_journal_store(hass, room_id),
+        )
+    return indexes[room_id]
+
+
+class JournalSearchIndex:
+    """SQLite FTS5 index over the notes of one room's journal.
+
+    Rows are keyed by the entry's position in the journal, and the number of
+    indexed entries is stored with them. New entries are added as they are
+    appended; anything the index missed (for example entries written while
+    it was unavailable) is caught up from the journal before each search.
+    If the journal ever has fewer entries than the index, it is rebuilt.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, path: Path, store: JournalStore) -> None:
+        """Initialize the index."""
+        self.path = path
+        self.store = store
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def add(self, position: int, entry: dict[str, Any]) -> None:
+        """Index an entry that was just appended at ``position``."""
+        with self._lock:
+            conn = self._connect()
+            if self._indexed_count(conn) != position:
+                self._catch_up(conn)
+                return
+            with conn:
+                self._insert(conn, position, entry)
+                self._set_indexed_count(conn, position + 1)
+
+    def search(self, query: str, limit: int) -> dict[str, Any]:
+        """Return the best matching entries for ``query``, best first."""
+        started = time.monotonic()
+        match = _match_expression(query)
+        hits: list[dict[str, Any]] = []
+        with self._lock:
+            conn = self._connect()
+            self._catch_up(conn)
+            if match:
+                rows = conn.execute(
+                    "SELECT position, timestamp, note, image_url, thumb_url,"
+                    " snippet(notes, 0, '**', '**', '…', 12), bm25(notes)"
+                    " FROM notes WHERE notes MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+                hits = [
+                    {
+                        "position": row[0],
+                        "timestamp": row[1],
+                        "note": row[2],
+                        "image_url": row[3],
+                        "thumb_url": row[4],
+                        "snippet": row[5],
+                        "score": round(-row[6], 3),
+                    }
+                    for row in rows
+                ]
+        return {
+            "hits": hits,
+            "took_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, rebuilding it from the journal if it is damaged."""
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError as err:
+            _LOGGER.warning("Journal search index %s unusable, rebuilding: %s", self.path, err)
+            self.path.unlink(missing_ok=True)
+            try:
+                self._conn = self._open()
+            except sqlite3.DatabaseError as err2:
+                raise HomeAssistantError(f"Could not open journal search index: {err2}") from err2
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Connect to the database, creating the schema if it is missing or outdated."""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SEARCH_SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS notes")
+                    conn.execute("DROP TABLE IF EXISTS state")
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE notes USING fts5("
+                        "note, timestamp UNINDEXED, image_url UNINDEXED, thumb_url UNINDEXED,"
+                        " position UNINDEXED,"
+                        " prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+                    )
+                    conn.execute("CREATE TABLE state (indexed_count INTEGER NOT NULL)")
+                    conn.execute("INSERT INTO state VALUES (0)")
+                    conn.execute(f"PRAGMA user_version = {SEARCH_SCHEMA_VERSION}")
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _catch_up(self, conn: sqlite3.Connection) -> None:
+        """Index journal entries appended since the last indexed one."""
+        indexed = self._indexed_count(conn)
+        total = self.store.count()
+        if indexed == total:
+            return
+        if indexed > total:
+            _LOGGER.info("Journal %s shrank, rebuilding its search index", self.store.room_id)
+            with conn:
+                conn.execute("DELETE FROM notes")
+            indexed = 0
+        with conn:
+            position = indexed
+            for entry in self.store.iter_entries(indexed):
+                self._insert(conn, position, entry)
+                position += 1
+            self._set_indexed_count(conn, position)
+        _LOGGER.debug(
+            "Indexed %d journal entries for %s", position - indexed, self.store.room_id
+        )
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, position: int, entry: dict[str, Any]) -> None:
+        """Insert one entry."""
+        conn.execute(
+            "INSERT INTO notes (note, timestamp, image_url, thumb_url, position)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                entry.get("note") or "",
+                entry.get("timestamp"),
+                entry.get("image_url"),
+                entry.get("thumb_url"),
+                position,
+            ),
+        )
+
+    @staticmethod
+    def _indexed_count(conn: sqlite3.Connection) -> int:
+        """Return the number of journal entries in the index."""
+        return conn.execute("SELECT indexed_count FROM state").fetchone()[0]
+
+    @staticmethod
+    def _set_indexed_count(conn: sqlite3.Connection, count: int) -> None:
+        """Record the number of journal entries in the index."""
+        conn.execute("UPDATE state SET indexed_count = ?", (count,))
+
+
+def _match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query matching all words.
+
+    Words are quoted so FTS5 operators in user input are taken literally,
+    and the last word matches as a prefix for search-as-you-type.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
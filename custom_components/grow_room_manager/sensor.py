@@ -1,24 +1,24 @@
 """Sensor platform for Grow Room Manager."""
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime, date, timedelta
-from pathlib import Path
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNKNOWN, PERCENTAGE
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     CONF_ROOM_ID,
     CONF_ROOM_NAME,
-    CONF_START_DATE,
-    CONF_START_DATE_ENTITY,
     CONF_ROOM_TYPE,
     ROOM_TYPE_FLOWER,
     ROOM_TYPE_VEG,
@@ -30,22 +30,23 @@ from .const import (
     PHASE_EARLY_VEG,
     PHASE_LATE_VEG,
     PHASE_MOTHER,
-    EC_STRETCH,
-    EC_BULK,
-    EC_FINISH,
     EC_CLONE,
     EC_PREVEG,
     EC_EARLY_VEG,
     EC_LATE_VEG,
     EC_MOTHER,
-    DRYBACK_STRETCH,
-    DRYBACK_BULK,
-    DRYBACK_FINISH,
     VEG_STAGE_DURATIONS,
-    ATHENA_SCHEDULE,
-    VEG_SCHEDULE,
+    VEG_STAGE_OFFSETS,
     ATHENA_FEED_CHART,
+    JOURNAL_RENDER_ENTRIES,
+    SIGNAL_JOURNAL_UPDATED,
+    SIGNAL_VEG_BATCHES_UPDATED,
 )
+from .batches import VegBatchRepository, get_batch_repository
+from .coordinator import GrowRoomCoordinator
+from .journal import get_journal_store
+from .render import JournalRenderer
+from .schedule import VEG_INDEX
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,11 +70,12 @@ async def async_setup_entry(
             GrowRoomJournalCountSensor(hass, room_id, room_name, entry),
         ]
     else:
-        # Flower room sensors
+        # Flower room sensors share the room coordinator
+        coordinator = hass.data[DOMAIN]["coordinators"][room_id]
         sensors = [
-            GrowRoomStatusSensor(hass, room_id, room_name, entry),
-            GrowRoomProgressSensor(hass, room_id, room_name, entry),
-            GrowRoomNextTaskSensor(hass, room_id, room_name, entry),
+            GrowRoomStatusSensor(coordinator, room_id, room_name, entry),
+            GrowRoomProgressSensor(coordinator, room_id, room_name, entry),
+            GrowRoomNextTaskSensor(coordinator, room_id, room_name, entry),
             GrowRoomJournalCountSensor(hass, room_id, room_name, entry),
         ]
     
@@ -96,58 +98,46 @@ class GrowRoomBaseSensor(SensorEntity):
         self._room_id = room_id
         self._room_name = room_name
         self._entry = entry
-        self._start_date: date | None = None
 
-    def _get_start_date(self) -> date | None:
-        """Get the start date from config entry or entity."""
-        # First check if there's a start date entity configured
-        start_date_entity = self._entry.data.get(CONF_START_DATE_ENTITY)
-        
-        if start_date_entity:
-            state = self.hass.states.get(start_date_entity)
-            if state and state.state not in (STATE_UNKNOWN, "unavailable", "unknown", None, ""):
-                try:
-                    date_str = state.state
-                    if "T" in date_str:
-                        date_str = date_str.split("T")[0]
-                    return datetime.strptime(date_str, "%Y-%m-%d").date()
-                except (ValueError, AttributeError):
-                    _LOGGER.debug("Could not parse date from entity %s", start_date_entity)
-        
-        # Fall back to static start date from config
-        start_date_str = self._entry.data.get(CONF_START_DATE)
-        
-        if start_date_str:
-            try:
-                if isinstance(start_date_str, date):
-                    return start_date_str
-                return datetime.strptime(start_date_str, "%Y-%m-%d").date()
-            except (ValueError, AttributeError):
-                pass
-        return None
 
-    def _get_current_day(self) -> int | None:
-        """Calculate current day of flower."""
-        if self._start_date is None:
-            return None
-        delta = date.today() - self._start_date
-        day = delta.days + 1
-        return day if day >= 1 else None
+class GrowRoomCoordinatorSensor(CoordinatorEntity[GrowRoomCoordinator], GrowRoomBaseSensor):
+    """Base class for flower room sensors backed by the room coordinator."""
+
+    def __init__(
+        self,
+        coordinator: GrowRoomCoordinator,
+        room_id: str,
+        room_name: str,
+        entry: ConfigEntry
+    ) -> None:
+        """Initialize the sensor."""
+        CoordinatorEntity.__init__(self, coordinator)
+        GrowRoomBaseSensor.__init__(self, coordinator.hass, room_id, room_name, entry)
+
+    @property
+    def _start_date(self) -> date | None:
+        """Return the room start date."""
+        return self.coordinator.data["start_date"]
+
+    @property
+    def _current_day(self) -> int | None:
+        """Return the current day of flower."""
+        return self.coordinator.data["current_day"]
 
 
-class GrowRoomStatusSensor(GrowRoomBaseSensor):
+class GrowRoomStatusSensor(GrowRoomCoordinatorSensor):
     """Sensor representing the grow status of a room."""
 
-    def __init__(self, hass: HomeAssistant, room_id: str, room_name: str, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: GrowRoomCoordinator, room_id: str, room_name: str, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
-        super().__init__(hass, room_id, room_name, entry)
+        super().__init__(coordinator, room_id, room_name, entry)
         self._attr_name = f"{room_name} Grow Status"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_grow_status"
-        self._current_day: int | None = None
-        self._phase: str = "Not Started"
-        self._recommended_ec: float | None = None
-        self._target_dryback: str | None = None
-        self._week: int | None = None
+
+    @property
+    def _phase(self) -> str:
+        """Return the current phase."""
+        return self.coordinator.data["phase"]
 
     @property
     def native_value(self) -> str:
@@ -159,15 +149,16 @@ class GrowRoomStatusSensor(GrowRoomBaseSensor):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
+        data = self.coordinator.data
         attrs = {
             "room_id": self._room_id,
             "room_name": self._room_name,
             "start_date": str(self._start_date) if self._start_date else None,
             "current_day": self._current_day,
-            "current_week": self._week,
+            "current_week": data["week"],
             "phase": self._phase,
-            "recommended_ec": self._recommended_ec,
-            "target_dryback": self._target_dryback,
+            "recommended_ec": data["recommended_ec"],
+            "target_dryback": data["target_dryback"],
             "days_remaining": self._calculate_days_remaining(),
             "harvest_window": self._is_harvest_window(),
             "days_in_phase": self._days_in_phase(),
@@ -204,15 +195,6 @@ class GrowRoomStatusSensor(GrowRoomBaseSensor):
             return "mdi:fruit-grapes"
         return "mdi:cannabis"
 
-    def _calculate_phase(self, day: int) -> tuple[str, float, str]:
-        """Calculate the current phase based on day number."""
-        if day <= 21:
-            return PHASE_STRETCH, EC_STRETCH, DRYBACK_STRETCH
-        elif day <= 55:
-            return PHASE_BULK, EC_BULK, DRYBACK_BULK
-        else:
-            return PHASE_FINISH, EC_FINISH, DRYBACK_FINISH
-
     def _calculate_days_remaining(self) -> int | None:
         """Calculate days remaining until typical harvest (Day 77)."""
         if self._current_day is not None and self._current_day >= 1:
@@ -249,34 +231,22 @@ class GrowRoomStatusSensor(GrowRoomBaseSensor):
             pct = min(100, int(((self._current_day - 55) / 29) * 100))
         return f"{pct}%"
 
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        self._start_date = self._get_start_date()
-        self._current_day = self._get_current_day()
-        
-        if self._current_day is not None and self._current_day >= 1:
-            self._week = ((self._current_day - 1) // 7) + 1
-            self._phase, self._recommended_ec, self._target_dryback = self._calculate_phase(
-                self._current_day
-            )
-        else:
-            self._week = None
-            self._phase = "Not Started"
-            self._recommended_ec = None
-            self._target_dryback = None
-
 
-class GrowRoomProgressSensor(GrowRoomBaseSensor):
+class GrowRoomProgressSensor(GrowRoomCoordinatorSensor):
     """Sensor showing overall grow cycle progress."""
 
-    def __init__(self, hass: HomeAssistant, room_id: str, room_name: str, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: GrowRoomCoordinator, room_id: str, room_name: str, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
-        super().__init__(hass, room_id, room_name, entry)
+        super().__init__(coordinator, room_id, room_name, entry)
         self._attr_name = f"{room_name} Grow Progress"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_grow_progress"
         self._attr_native_unit_of_measurement = PERCENTAGE
         self._attr_device_class = SensorDeviceClass.POWER_FACTOR
-        self._progress: int = 0
+
+    @property
+    def _progress(self) -> int:
+        """Return the progress through the 84-day cycle."""
+        return self.coordinator.data["progress"]
 
     @property
     def native_value(self) -> int:
@@ -297,94 +267,65 @@ class GrowRoomProgressSensor(GrowRoomBaseSensor):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
-        current_day = self._get_current_day()
         return {
             "room_id": self._room_id,
-            "current_day": current_day,
+            "current_day": self._current_day,
             "total_days": 84,
             "estimated_harvest": str(self._start_date + timedelta(days=76)) if self._start_date else None,
         }
 
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        self._start_date = self._get_start_date()
-        current_day = self._get_current_day()
-        
-        if current_day is not None and current_day >= 1:
-            # Progress based on 84-day cycle
-            self._progress = min(100, int((current_day / 84) * 100))
-        else:
-            self._progress = 0
-
 
-class GrowRoomNextTaskSensor(GrowRoomBaseSensor):
+class GrowRoomNextTaskSensor(GrowRoomCoordinatorSensor):
     """Sensor showing the next scheduled task."""
 
-    def __init__(self, hass: HomeAssistant, room_id: str, room_name: str, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: GrowRoomCoordinator, room_id: str, room_name: str, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
-        super().__init__(hass, room_id, room_name, entry)
+        super().__init__(coordinator, room_id, room_name, entry)
         self._attr_name = f"{room_name} Next Task"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_next_task"
-        self._next_task: str | None = None
-        self._next_task_day: int | None = None
-        self._next_task_date: date | None = None
-        self._next_task_priority: str | None = None
-        self._days_until: int | None = None
+
+    @property
+    def _next_task(self) -> dict[str, Any]:
+        """Return the next task from the room snapshot."""
+        return self.coordinator.data["next_task"] or {}
 
     @property
     def native_value(self) -> str:
         """Return the next task title."""
-        return self._next_task or "No upcoming tasks"
+        return self._next_task.get("title") or "No upcoming tasks"
 
     @property
     def icon(self) -> str:
         """Return icon based on priority."""
-        if self._next_task_priority == "critical":
+        priority = self._next_task.get("priority")
+        if priority == "critical":
             return "mdi:alert-circle"
-        elif self._next_task_priority == "high":
+        elif priority == "high":
             return "mdi:alert"
         return "mdi:calendar-check"
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
+        task = self._next_task
         return {
             "room_id": self._room_id,
-            "task_day": self._next_task_day,
-            "task_date": str(self._next_task_date) if self._next_task_date else None,
-            "days_until": self._days_until,
-            "priority": self._next_task_priority,
+            "task_day": task.get("day"),
+            "task_date": str(task["date"]) if task.get("date") else None,
+            "days_until": task.get("days_until"),
+            "priority": task.get("priority"),
         }
 
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        self._start_date = self._get_start_date()
-        current_day = self._get_current_day()
-        
-        self._next_task = None
-        self._next_task_day = None
-        self._next_task_date = None
-        self._next_task_priority = None
-        self._days_until = None
-        
-        if current_day is None or self._start_date is None:
-            return
-        
-        # Find the next task
-        sorted_days = sorted(ATHENA_SCHEDULE.keys())
-        for task_day in sorted_days:
-            if task_day >= current_day:
-                task_info = ATHENA_SCHEDULE[task_day]
-                self._next_task = task_info["title"]
-                self._next_task_day = task_day
-                self._next_task_date = self._start_date + timedelta(days=task_day - 1)
-                self._next_task_priority = task_info.get("priority", "medium")
-                self._days_until = task_day - current_day
-                break
-
 
 class GrowRoomJournalCountSensor(GrowRoomBaseSensor):
-    """Sensor showing journal entry count."""
+    """Sensor showing journal entry count.
+
+    The ``markdown`` attribute holds the most recent entries formatted for a
+    markdown card. It is re-rendered only when the journal changes and is
+    kept out of the recorder.
+    """
+
+    _unrecorded_attributes = frozenset({"markdown"})
 
     def __init__(self, hass: HomeAssistant, room_id: str, room_name: str, entry: ConfigEntry) -> None:
         """Initialize the sensor."""
@@ -392,9 +333,28 @@ class GrowRoomJournalCountSensor(GrowRoomBaseSensor):
         self._attr_name = f"{room_name} Journal Entries"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_journal_count"
         self._attr_icon = "mdi:notebook"
+        self._attr_should_poll = False
         self._count: int = 0
         self._last_entry: str | None = None
         self._last_entry_date: str | None = None
+        self._signature: tuple[int, int] | None = None
+        self._markdown: str | None = None
+        self._renderer = JournalRenderer(get_journal_store(hass, room_id), JOURNAL_RENDER_ENTRIES)
+
+    async def async_added_to_hass(self) -> None:
+        """Update when an entry is added to this room's journal."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_JOURNAL_UPDATED.format(self._room_id),
+                self._async_handle_journal_update,
+            )
+        )
+
+    @callback
+    def _async_handle_journal_update(self) -> None:
+        """Schedule an update after a journal append."""
+        self.async_schedule_update_ha_state(True)
 
     @property
     def native_value(self) -> int:
@@ -408,39 +368,50 @@ class GrowRoomJournalCountSensor(GrowRoomBaseSensor):
             "room_id": self._room_id,
             "last_entry_preview": self._last_entry[:100] + "..." if self._last_entry and len(self._last_entry) > 100 else self._last_entry,
             "last_entry_date": self._last_entry_date,
+            "markdown": self._markdown,
         }
 
     async def async_update(self) -> None:
-        """Update the sensor."""
-        journal_file = Path(self.hass.config.path()) / "grow_logs" / f"{self._room_id}.json"
+        """Update the sensor, skipping the read if the journal is unchanged."""
+        store = get_journal_store(self.hass, self._room_id)
         
-        if journal_file.exists():
-            try:
-                data = await self.hass.async_add_executor_job(self._read_journal, journal_file)
-                self._count = len(data)
-                if data:
-                    last = data[-1]
-                    self._last_entry = last.get("note")
-                    self._last_entry_date = last.get("timestamp", "")[:10]
-                else:
-                    self._last_entry = None
-                    self._last_entry_date = None
-            except Exception as err:
-                _LOGGER.error("Error reading journal: %s", err)
-                self._count = 0
-        else:
+        try:
+            summary = await self.hass.async_add_executor_job(store.summary)
+        except Exception as err:
+            _LOGGER.error("Error reading journal: %s", err)
             self._count = 0
+            self._signature = None
+            return
+        
+        if summary.signature is not None and summary.signature == self._signature:
+            return
+        self._signature = summary.signature
+        self._count = summary.count
+        
+        try:
+            self._markdown = await self.hass.async_add_executor_job(self._renderer.render)
+        except Exception as err:
+            _LOGGER.error("Error rendering journal: %s", err)
+            self._markdown = None
+        
+        last = summary.last_entry
+        if last:
+            self._last_entry = last.get("note")
+            self._last_entry_date = last.get("timestamp", "")[:10]
+        else:
             self._last_entry = None
             self._last_entry_date = None
 
-    def _read_journal(self, path: Path) -> list:
-        """Read journal file."""
-        with open(path, "r") as f:
-            return json.load(f)
 
+class VegRoomBaseSensor(SensorEntity):
+    """Base class for veg room sensors.
 
-class VegRoomStatusSensor(SensorEntity):
-    """Sensor showing veg room status with batch summary."""
+    Veg sensors change only when batches change or the date rolls over, so
+    they update on batch change signals and at local midnight instead of
+    polling.
+    """
+
+    _attr_should_poll = False
 
     def __init__(
         self, 
@@ -454,11 +425,51 @@ class VegRoomStatusSensor(SensorEntity):
         self._room_id = room_id
         self._room_name = room_name
         self._entry = entry
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to batch changes and the midnight rollover."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_VEG_BATCHES_UPDATED.format(self._room_id),
+                self._async_handle_update,
+            )
+        )
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_handle_update, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_handle_update(self, *_: Any) -> None:
+        """Schedule an update."""
+        self.async_schedule_update_ha_state(True)
+
+
+class VegRoomStatusSensor(VegRoomBaseSensor):
+    """Sensor showing veg room status with batch summary.
+
+    The per-stage aggregates are maintained by the batch repository, so an
+    update only copies them, and state is written only when they changed.
+    """
+
+    def __init__(
+        self, 
+        hass: HomeAssistant, 
+        room_id: str, 
+        room_name: str,
+        entry: ConfigEntry
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, room_id, room_name, entry)
         self._attr_name = f"{room_name} Status"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_veg_status"
         self._batch_count: int = 0
         self._batches_by_stage: dict = {}
         self._total_plants: int = 0
+        self._most_advanced: str | None = None
+        self._seen: tuple[VegBatchRepository, int] | None = None
 
     @property
     def native_value(self) -> str:
@@ -485,25 +496,16 @@ class VegRoomStatusSensor(SensorEntity):
         }
         
         # Add recommended EC based on most advanced stage
-        if self._batches_by_stage:
-            stages_present = list(self._batches_by_stage.keys())
-            stage_order = [PHASE_CLONE, PHASE_PREVEG, PHASE_EARLY_VEG, PHASE_LATE_VEG, PHASE_MOTHER]
-            most_advanced = None
-            for stage in reversed(stage_order):
-                if stage in stages_present:
-                    most_advanced = stage
-                    break
-            
-            if most_advanced:
-                ec_map = {
-                    PHASE_CLONE: EC_CLONE,
-                    PHASE_PREVEG: EC_PREVEG,
-                    PHASE_EARLY_VEG: EC_EARLY_VEG,
-                    PHASE_LATE_VEG: EC_LATE_VEG,
-                    PHASE_MOTHER: EC_MOTHER,
-                }
-                attrs["recommended_ec"] = ec_map.get(most_advanced, 1.5)
-                attrs["most_advanced_stage"] = most_advanced
+        if self._most_advanced:
+            ec_map = {
+                PHASE_CLONE: EC_CLONE,
+                PHASE_PREVEG: EC_PREVEG,
+                PHASE_EARLY_VEG: EC_EARLY_VEG,
+                PHASE_LATE_VEG: EC_LATE_VEG,
+                PHASE_MOTHER: EC_MOTHER,
+            }
+            attrs["recommended_ec"] = ec_map.get(self._most_advanced, 1.5)
+            attrs["most_advanced_stage"] = self._most_advanced
         
         # Environmental targets for veg
         attrs["target_temp_day"] = "75-82°F (24-28°C)"
@@ -516,27 +518,28 @@ class VegRoomStatusSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        batches = self.hass.data.get(DOMAIN, {}).get("veg_batches", {}).get(self._room_id, [])
-        
-        # Filter active batches
-        active_batches = [b for b in batches if b.get("active", True)]
-        self._batch_count = len(active_batches)
-        
-        # Count by stage
-        self._batches_by_stage = {}
-        self._total_plants = 0
-        
-        for batch in active_batches:
-            stage = batch.get("stage", "Unknown")
-            if stage not in self._batches_by_stage:
-                self._batches_by_stage[stage] = {"count": 0, "plants": 0, "batches": []}
-            self._batches_by_stage[stage]["count"] += 1
-            self._batches_by_stage[stage]["plants"] += batch.get("plant_count", 0)
-            self._batches_by_stage[stage]["batches"].append(batch.get("batch_name", "Unknown"))
-            self._total_plants += batch.get("plant_count", 0)
-
-
-class VegRoomBatchCountSensor(SensorEntity):
+        self._refresh()
+
+    @callback
+    def _async_handle_update(self, *_: Any) -> None:
+        """Write state only if the batch aggregates changed."""
+        if self._refresh():
+            self.async_write_ha_state()
+
+    def _refresh(self) -> bool:
+        """Copy the aggregates from the repository, returning True on change."""
+        repo = get_batch_repository(self.hass, self._room_id)
+        if self._seen is not None and self._seen[0] is repo and self._seen[1] == repo.revision:
+            return False
+        self._seen = (repo, repo.revision)
+        self._batch_count = repo.active_count
+        self._batches_by_stage = repo.stage_summary()
+        self._total_plants = repo.total_plants
+        self._most_advanced = repo.most_advanced_stage
+        return True
+
+
+class VegRoomBatchCountSensor(VegRoomBaseSensor):
     """Sensor showing count of active veg batches."""
 
     def __init__(
@@ -547,10 +550,7 @@ class VegRoomBatchCountSensor(SensorEntity):
         entry: ConfigEntry
     ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._room_id = room_id
-        self._room_name = room_name
-        self._entry = entry
+        super().__init__(hass, room_id, room_name, entry)
         self._attr_name = f"{room_name} Active Batches"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_batch_count"
         self._attr_icon = "mdi:package-variant"
@@ -583,12 +583,11 @@ class VegRoomBatchCountSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        batches = self.hass.data.get(DOMAIN, {}).get("veg_batches", {}).get(self._room_id, [])
-        self._batches = [b for b in batches if b.get("active", True)]
+        self._batches = get_batch_repository(self.hass, self._room_id).active()
         self._count = len(self._batches)
 
 
-class VegRoomNextTaskSensor(SensorEntity):
+class VegRoomNextTaskSensor(VegRoomBaseSensor):
     """Sensor showing next task across all veg batches."""
 
     def __init__(
@@ -599,10 +598,7 @@ class VegRoomNextTaskSensor(SensorEntity):
         entry: ConfigEntry
     ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._room_id = room_id
-        self._room_name = room_name
-        self._entry = entry
+        super().__init__(hass, room_id, room_name, entry)
         self._attr_name = f"{room_name} Next Task"
         self._attr_unique_id = f"{DOMAIN}_{room_id}_veg_next_task"
         self._next_task: str | None = None
@@ -632,8 +628,7 @@ class VegRoomNextTaskSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        batches = self.hass.data.get(DOMAIN, {}).get("veg_batches", {}).get(self._room_id, [])
-        active_batches = [b for b in batches if b.get("active", True)]
+        active_batches = get_batch_repository(self.hass, self._room_id).active()
         
         self._next_task = None
         self._next_task_date = None
@@ -643,7 +638,7 @@ class VegRoomNextTaskSensor(SensorEntity):
         if not active_batches:
             return
         
-        today = date.today()
+        today = dt_util.now().date()
         earliest_task = None
         earliest_date = None
         earliest_batch = None
@@ -662,28 +657,20 @@ class VegRoomNextTaskSensor(SensorEntity):
             except ValueError:
                 continue
             
-            # Calculate day offset based on stage
-            stage_offsets = {
-                PHASE_CLONE: 0,
-                PHASE_PREVEG: 14,
-                PHASE_EARLY_VEG: 21,
-                PHASE_LATE_VEG: 35,
-                PHASE_MOTHER: 0,
-            }
-            day_offset = stage_offsets.get(stage, 0)
+            day_offset = VEG_STAGE_OFFSETS.get(stage, 0)
             
             # Find next task for this batch
             current_day = (today - start_date).days + 1 + day_offset
+            found = VEG_INDEX.next_task(current_day)
+            if found is None:
+                continue
             
-            for task_day in sorted(VEG_SCHEDULE.keys()):
-                if task_day >= current_day:
-                    task_date = start_date + timedelta(days=task_day - day_offset - 1)
-                    if task_date >= today:
-                        if earliest_date is None or task_date < earliest_date:
-                            earliest_date = task_date
-                            earliest_task = VEG_SCHEDULE[task_day]["title"]
-                            earliest_batch = batch_name
-                        break
+            task_day, task_info = found
+            task_date = start_date + timedelta(days=task_day - day_offset - 1)
+            if earliest_date is None or task_date < earliest_date:
+                earliest_date = task_date
+                earliest_task = task_info["title"]
+                earliest_batch = batch_name
         
         if earliest_task:
             self._next_task = earliest_task
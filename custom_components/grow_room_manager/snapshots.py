@@ -0,0 +1,316 @@
+"""Camera snapshot processing for Grow Room Manager."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+from .journal import JournalStore, get_journal_store
+from .storage import CorruptFileError, atomic_write, load_json
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    # Without Pillow snapshots are stored as they come from the camera
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Longest edge and JPEG quality of stored snapshots
+SNAPSHOT_MAX_SIZE = 1920
+SNAPSHOT_QUALITY = 85
+
+# Longest edge and JPEG quality of the thumbnails shown in journal lists
+THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 70
+
+THUMBNAIL_DIR = "thumbs"
+
+# Hex digits of the SHA-256 of the camera image used as the file name
+HASH_LENGTH = 32
+
+# Names of the snapshot files this integration writes; cleanup never
+# touches anything else
+SNAPSHOT_NAME = re.compile(rf"[0-9a-f]{{{HASH_LENGTH}}}\.jpg")
+
+
+class Snapshot(NamedTuple):
+    """Files of one camera snapshot, relative to the image directory."""
+
+    image: str
+    thumbnail: str | None
+    reused: bool = False
+
+
+async def async_capture_snapshots(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    image_dir: Path,
+    timeout: float,
+) -> list[tuple[str, Snapshot]]:
+    """Fetch and store a snapshot from each camera, all at once.
+
+    Every camera is fetched concurrently with its own ``timeout``, and each
+    image is stored in the executor as soon as it arrives, so the whole
+    capture takes as long as the slowest camera rather than the sum. A
+    camera that fails or times out is logged and left out. Returns
+    (entity_id, snapshot) for the cameras that succeeded, in the given order.
+    """
+    from homeassistant.components.camera import async_get_image
+
+    started = time.monotonic()
+
+    async def capture(entity_id: str) -> Snapshot:
+        async with asyncio.timeout(timeout):
+            image = await async_get_image(hass, entity_id, timeout=timeout)
+        return await hass.async_add_executor_job(save_snapshot, image.content, image_dir)
+
+    results = await asyncio.gather(
+        *(capture(entity_id) for entity_id in entity_ids), return_exceptions=True
+    )
+
+    captured = []
+    for entity_id, result in zip(entity_ids, results):
+        if isinstance(result, TimeoutError):
+            _LOGGER.error("Camera %s did not return an image within %ss", entity_id, timeout)
+        elif isinstance(result, Exception):
+            _LOGGER.error("Failed to take snapshot from %s: %s", entity_id, result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            captured.append((entity_id, result))
+    _LOGGER.debug(
+        "Captured %d of %d snapshots in %.2fs",
+        len(captured), len(entity_ids), time.monotonic() - started,
+    )
+    return captured
+
+
+def save_snapshot(content: bytes, image_dir: Path) -> Snapshot:
+    """Store a camera image as a size-capped JPEG plus a thumbnail.
+
+    Files are named after the hash of the camera image, so an identical
+    frame (an idle camera, an automation firing repeatedly) is stored once:
+    if the files already exist they are reused without decoding or writing
+    anything. The image is scaled down to ``SNAPSHOT_MAX_SIZE`` and re-encoded at
+    ``SNAPSHOT_QUALITY``, unless it already fits and the original bytes are
+    smaller. The thumbnail goes to ``thumbs/<name>``. Without Pillow, or for
+    an image Pillow cannot read, the original bytes are stored unchanged and
+    there is no thumbnail.
+
+    Blocking and CPU bound; must run in the executor.
+    """
+    name = f"{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.jpg"
+    image_path = image_dir / name
+    thumb_name = f"{THUMBNAIL_DIR}/{name}"
+    if image_path.is_file():
+        has_thumb = (image_dir / thumb_name).is_file()
+        if has_thumb or Image is None:
+            _LOGGER.debug("Snapshot %s already stored", name)
+            return Snapshot(name, thumb_name if has_thumb else None, reused=True)
+
+    if Image is None:
+        atomic_write(image_path, content, durable=False)
+        return Snapshot(name, None)
+
+    try:
+        full, thumbnail = _process(content)
+    except (OSError, ValueError, Image.DecompressionBombError) as err:
+        _LOGGER.warning("Could not process snapshot %s, storing it unchanged: %s", name, err)
+        atomic_write(image_path, content, durable=False)
+        return Snapshot(name, None)
+
+    atomic_write(image_path, full, durable=False)
+    atomic_write(image_dir / thumb_name, thumbnail, durable=False)
+    _LOGGER.debug(
+        "Stored snapshot %s: %d bytes (was %d), thumbnail %d bytes",
+        name, len(full), len(content), len(thumbnail),
+    )
+    return Snapshot(name, thumb_name)
+
+
+def _process(content: bytes) -> tuple[bytes, bytes]:
+    """Return the capped full image and the thumbnail as JPEG bytes."""
+    with Image.open(io.BytesIO(content)) as original:
+        original.draft("RGB", (SNAPSHOT_MAX_SIZE, SNAPSHOT_MAX_SIZE))
+        image = ImageOps.exif_transpose(original).convert("RGB")
+        was_jpeg = original.format == "JPEG"
+
+    fits = max(image.size) <= SNAPSHOT_MAX_SIZE
+    if not fits:
+        image.thumbnail((SNAPSHOT_MAX_SIZE, SNAPSHOT_MAX_SIZE), Image.Resampling.LANCZOS)
+    full = _encode(image, SNAPSHOT_QUALITY)
+    if fits and was_jpeg and len(content) <= len(full):
+        full = content
+
+    image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+    return full, _encode(image, THUMBNAIL_QUALITY)
+
+
+def _encode(image: Image.Image, quality: int) -> bytes:
+    """Encode an image as a progressive JPEG."""
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def get_snapshot_refs(hass: HomeAssistant, room_id: str) -> SnapshotRefs:
+    """Return the shared snapshot reference map for a room."""
+    refs = hass.data.setdefault(DOMAIN, {}).setdefault("snapshot_refs", {})
+    if room_id not in refs:
+        refs[room_id] = SnapshotRefs(
+            Path(hass.config.path()) / "grow_logs" / f"{room_id}_snapshot_refs.json",
+            Path(hass.config.path()) / "www" / "grow_logs" / room_id,
+            get_journal_store(hass, room_id),
+        )
+    return refs[room_id]
+
+
+class SnapshotRefs:
+    """Count how many journal entries use each snapshot file of a room.
+
+    The map is kept up to date like the search index: entries are added as
+    they are appended, anything missed is caught up from the journal, and
+    the map is rebuilt if the journal has fewer entries than it has seen.
+    Files are keyed by their path relative to the room's image directory.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, path: Path, image_dir: Path, store: JournalStore) -> None:
+        """Initialize the reference map."""
+        self.path = path
+        self.image_dir = image_dir
+        self.store = store
+        self._lock = threading.Lock()
+        self._refs: dict[str, int] | None = None
+        self._journal_count = 0
+
+    def add(self, position: int, entry: dict[str, Any]) -> None:
+        """Count the snapshots of an entry that was just appended at ``position``."""
+        with self._lock:
+            refs = self._load()
+            if self._journal_count != position:
+                self._catch_up(refs)
+                return
+            names = self._names(entry)
+            self._count(refs, names)
+            self._journal_count = position + 1
+            if names:
+                self._save(refs)
+
+    def collect(self, grace: float, dry_run: bool = False) -> dict[str, Any]:
+        """Delete snapshot files that no journal entry refers to.
+
+        Only content-addressed snapshots and their thumbnails are considered;
+        other files in the image directory are never touched. Files modified
+        in the last ``grace`` seconds are kept, since their entry may not have
+        been appended yet. If the journal or the reference map is empty,
+        nothing is deleted, since every snapshot would look unreferenced.
+        With ``dry_run`` nothing is deleted and the result only reports what
+        would be.
+        """
+        removed: list[str] = []
+        freed = 0
+        with self._lock:
+            refs = self._load()
+            self._catch_up(refs)
+            if not refs or not self.store.count():
+                raise HomeAssistantError(
+                    f"No journal entry of {self.store.room_id} refers to a snapshot; "
+                    "refusing to clean up"
+                )
+            cutoff = time.time() - grace
+            for directory in (self.image_dir, self.image_dir / THUMBNAIL_DIR):
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    if not path.is_file() or not SNAPSHOT_NAME.fullmatch(path.name):
+                        continue
+                    key = path.relative_to(self.image_dir).as_posix()
+                    if key in refs:
+                        continue
+                    stat = path.stat()
+                    if stat.st_mtime > cutoff:
+                        continue
+                    if not dry_run:
+                        path.unlink(missing_ok=True)
+                    removed.append(key)
+                    freed += stat.st_size
+        _LOGGER.info(
+            "%s %d unreferenced snapshot files (%d bytes) for %s",
+            "Found" if dry_run else "Removed", len(removed), freed, self.store.room_id,
+        )
+        return {
+            "removed": len(removed),
+            "freed_bytes": freed,
+            "referenced": len(refs),
+            "files": sorted(removed),
+        }
+
+    def _load(self) -> dict[str, int]:
+        """Load the map from disk once."""
+        if self._refs is None:
+            try:
+                data = load_json(self.path, dict)
+            except CorruptFileError as err:
+                # The map is derived from the journal; rebuild it
+                _LOGGER.warning("Snapshot references lost, rebuilding: %s", err)
+                data = {}
+            self._refs = data.get("refs", {})
+            self._journal_count = data.get("journal_count", 0)
+        return self._refs
+
+    def _catch_up(self, refs: dict[str, int]) -> None:
+        """Count the snapshots of entries appended since the last counted one."""
+        total = self.store.count()
+        if self._journal_count == total:
+            return
+        if self._journal_count > total:
+            _LOGGER.info("Journal %s shrank, rebuilding snapshot references", self.store.room_id)
+            refs.clear()
+            self._journal_count = 0
+        for entry in self.store.iter_entries(self._journal_count):
+            self._count(refs, self._names(entry))
+            self._journal_count += 1
+        self._save(refs)
+
+    @staticmethod
+    def _names(entry: dict[str, Any]) -> list[str]:
+        """Return the files in the image directory an entry refers to.
+
+        Only file names are compared, so entries written before the config
+        directory moved still protect their files.
+        """
+        names = []
+        for image in entry.get("images") or [entry]:
+            if image.get("image_path"):
+                names.append(Path(image["image_path"]).name)
+            if image.get("thumb_path"):
+                names.append(f"{THUMBNAIL_DIR}/{Path(image['thumb_path']).name}")
+        return names
+
+    @staticmethod
+    def _count(refs: dict[str, int], names: list[str]) -> None:
+        """Add one reference to each file."""
+        for name in names:
+            refs[name] = refs.get(name, 0) + 1
+
+    def _save(self, refs: dict[str, int]) -> None:
+        """Persist the map; it can always be rebuilt from the journal."""
+        atomic_write(
+            self.path,
+            json.dumps({"journal_count": self._journal_count, "refs": refs}),
+            durable=False,
+        )
@@ -0,0 +1,167 @@
+"""Crash-safe file storage for Grow Room Manager."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CorruptFileError(HomeAssistantError):
+    """A data file could not be parsed and no usable backup was found."""
+
+    def __init__(self, path: Path, quarantine_path: Path) -> None:
+        """Initialize the error."""
+        super().__init__(f"{path} is corrupt and was moved to {quarantine_path}")
+        self.path = path
+        self.quarantine_path = quarantine_path
+
+
+def backup_path(path: Path) -> Path:
+    """Return the rolling backup path for a file."""
+    return path.with_name(f"{path.name}.bak")
+
+
+@contextmanager
+def atomic_open(path: Path, durable: bool = True, backup: bool = False) -> Iterator[IO[bytes]]:
+    """Open a temp file in binary mode that replaces ``path`` on success.
+
+    The temp file lives next to the target and is renamed over it only after
+    the block completes, so readers see either the old or the new file and
+    never a partial one. With ``durable`` the data and the rename are
+    fsynced. With ``backup`` the previous file is kept as ``<name>.bak``.
+    If the block raises, the target is left untouched.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+            if backup:
+                bak = backup_path(path)
+                bak_tmp = bak.with_name(f".{bak.name}.tmp")
+                shutil.copyfile(path, bak_tmp)
+                os.replace(bak_tmp, bak)
+        else:
+            # mkstemp creates files readable by the owner only
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    if durable:
+        _fsync_dir(path.parent)
+
+
+def atomic_write(
+    path: Path, data: str | bytes, durable: bool = True, backup: bool = False
+) -> None:
+    """Atomically replace ``path`` with ``data``."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with atomic_open(path, durable=durable, backup=backup) as f:
+        f.write(data)
+
+
+def load_json(path: Path, default: Callable[[], Any]) -> Any:
+    """Load a JSON file written with ``atomic_write``.
+
+    A missing file yields ``default()``. A file that does not parse, or does
+    not hold the same type as ``default()``, is moved aside to a
+    ``.corrupt-<timestamp>`` file and restored from its ``.bak``. If there is
+    no usable backup, ``CorruptFileError`` is raised so the caller can report
+    it instead of silently starting over.
+    """
+    expected = type(default())
+    try:
+        data = _read_json(path, expected)
+    except FileNotFoundError:
+        return default()
+    except ValueError as err:
+        quarantined = quarantine(path)
+        _LOGGER.error("Could not read %s, moved it to %s: %s", path, quarantined, err)
+    else:
+        return data
+
+    bak = backup_path(path)
+    try:
+        data = _read_json(bak, expected)
+    except (FileNotFoundError, ValueError):
+        raise CorruptFileError(path, quarantined) from None
+    atomic_write(path, bak.read_bytes())
+    _LOGGER.warning("Restored %s from %s", path, bak)
+    return data
+
+
+def quarantine(path: Path) -> Path:
+    """Move a damaged file aside, keeping it for manual repair."""
+    stem = f"{path.name}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    target = path.with_name(stem)
+    attempt = 1
+    while target.exists():
+        target = path.with_name(f"{stem}_{attempt}")
+        attempt += 1
+    os.replace(path, target)
+    return target
+
+
+@callback
+def async_report_corrupt_file(hass: HomeAssistant, err: CorruptFileError) -> None:
+    """Raise a repair issue for a data file that had to be quarantined."""
+    ir.async_create_issue(
+        hass,
+        DOMAIN,
+        f"corrupt_file_{err.path.name}",
+        is_fixable=False,
+        severity=ir.IssueSeverity.ERROR,
+        translation_key="corrupt_file",
+        translation_placeholders={
+            "path": str(err.path),
+            "quarantine_path": str(err.quarantine_path),
+        },
+    )
+
+
+def _read_json(path: Path, expected: type) -> Any:
+    """Read and parse a JSON file, checking the top-level type."""
+    with open(path, "rb") as f:
+        data = json.loads(f.read())
+    if not isinstance(data, expected):
+        raise ValueError(f"expected {expected.__name__}, found {type(data).__name__}")
+    return data
+
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry so a rename survives power loss."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,675 @@
+"""Calendar and todo task creation for Grow Room Manager."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .storage import CorruptFileError, async_report_corrupt_file, atomic_write, load_json
+
+_LOGGER = logging.getLogger(__name__)
+
+# Payload shapes for calendar.create_event and todo.add_item/update_item
+SHAPE_ALL_DAY = "all_day"
+SHAPE_TIMED = "timed"
+SHAPE_WITH_DESCRIPTION = "with_description"
+SHAPE_PLAIN = "plain"
+
+SIDE_CALENDAR = "calendar"
+SIDE_TODO = "todo"
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+ACTION_UNCHANGED = "unchanged"
+
+
+class TaskSpec(NamedTuple):
+    """A single task to create on the calendar and/or todo list."""
+
+    day: int
+    title: str
+    description: str
+    task_date: date
+
+
+class TaskRunReport(NamedTuple):
+    """Outcome of a task sync run."""
+
+    results: list[dict[str, Any]]
+    created: int
+    updated: int
+    deleted: int
+    unchanged: int
+    failed: int
+    duration: float
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary suitable for events and logs."""
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "duration_seconds": round(self.duration, 2),
+        }
+
+
+async def async_get_task_ledger(hass: HomeAssistant, room_id: str) -> TaskLedger:
+    """Return the loaded task ledger for a room."""
+    ledgers = hass.data.setdefault(DOMAIN, {}).setdefault("ledgers", {})
+    if room_id not in ledgers:
+        ledger = TaskLedger(Path(hass.config.path()) / "grow_logs" / f"{room_id}_tasks.json")
+        try:
+            await hass.async_add_executor_job(ledger.load)
+        except CorruptFileError as err:
+            _LOGGER.error("Task ledger for %s lost, tasks may be duplicated: %s", room_id, err)
+            async_report_corrupt_file(hass, err)
+        ledgers[room_id] = ledger
+    return ledgers[room_id]
+
+
+class TaskLedger:
+    """Record of the calendar events and todo items created for a room.
+
+    Records are grouped by scope (the room itself or a veg batch) and keyed
+    by schedule day. Each record holds one state per side ("calendar" and
+    "todo") with the entity, UID, title, date and description digest the
+    task was last written with.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the ledger."""
+        self.path = path
+        self.scopes: dict[str, dict[str, dict[str, Any]]] = {}
+        self.lock = asyncio.Lock()
+
+    def load(self) -> None:
+        """Load the ledger from disk, restoring it from its backup if damaged."""
+        self.scopes = load_json(self.path, dict)
+
+    def save(self) -> None:
+        """Save the ledger to disk."""
+        atomic_write(self.path, json.dumps(self.scopes, indent=2), backup=True)
+
+
+async def async_sync_tasks(
+    hass: HomeAssistant,
+    ledger: TaskLedger,
+    scope: str,
+    specs: list[TaskSpec],
+    calendar_entity: str | None,
+    todo_entity: str | None,
+    max_concurrency: int,
+    keep_before: date | None = None,
+) -> TaskRunReport:
+    """Bring calendar events and todo items for a scope in line with ``specs``.
+
+    Tasks are compared with the ledger and only the differences are applied:
+    new tasks are created, moved or reworded tasks are updated in place, and
+    tasks no longer in ``specs`` (or on an entity that is no longer used) are
+    deleted. Records dated before ``keep_before`` are never deleted, so past
+    tasks survive a schedule that only lists upcoming ones.
+
+    Tasks that exist on an entity but not in the ledger (created before the
+    ledger was kept) are adopted by title instead of being created again.
+
+    At most ``max_concurrency`` operations are in flight at once. Payload
+    fallbacks are resolved once per entity through the capability cache.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    started = time.monotonic()
+    wanted = {SIDE_CALENDAR: calendar_entity or None, SIDE_TODO: todo_entity or None}
+
+    async with ledger.lock:
+        records = ledger.scopes.setdefault(scope, {})
+        desired = {str(spec.day): spec for spec in specs}
+        await _async_adopt_existing(hass, records, desired, wanted)
+        jobs = []
+        results: list[dict[str, Any]] = []
+
+        for key in set(records) | set(desired):
+            spec = desired.get(key)
+            record = records.setdefault(key, {})
+            for side in (SIDE_CALENDAR, SIDE_TODO):
+                state = record.get(side)
+                entity_id = wanted[side] if spec else None
+                if state and state["entity"] != entity_id:
+                    if spec is None and keep_before and state["date"] < keep_before.isoformat():
+                        continue
+                    jobs.append(_async_delete(hass, record, side, key, state))
+                    state = None
+                if entity_id is None:
+                    continue
+                if state is None:
+                    jobs.append(_async_create(hass, record, side, entity_id, spec))
+                elif _state_matches(state, spec):
+                    results.append({"day": spec.day, "side": side, "action": ACTION_UNCHANGED, "ok": True})
+                else:
+                    jobs.append(_async_update(hass, record, side, spec))
+
+        async def run(job: Any) -> dict[str, Any]:
+            async with semaphore:
+                return await job
+
+        results.extend(await asyncio.gather(*(run(job) for job in jobs)))
+
+        # Created tasks, and events replaced instead of updated, have no UID yet
+        written = [r for r in results if r["action"] in (ACTION_CREATE, ACTION_UPDATE) and r["ok"]]
+        for side in (SIDE_CALENDAR, SIDE_TODO):
+            if wanted[side] and any(r["side"] == side for r in written):
+                await _async_resolve_uids(hass, side, wanted[side], records)
+
+        for key in [key for key, record in records.items() if not record]:
+            del records[key]
+        if not records:
+            ledger.scopes.pop(scope, None)
+        await hass.async_add_executor_job(ledger.save)
+
+    counts = {action: 0 for action in (ACTION_CREATE, ACTION_UPDATE, ACTION_DELETE, ACTION_UNCHANGED)}
+    failed = 0
+    for result in results:
+        if result["ok"]:
+            counts[result["action"]] += 1
+        else:
+            failed += 1
+
+    return TaskRunReport(
+        results=results,
+        created=counts[ACTION_CREATE],
+        updated=counts[ACTION_UPDATE],
+        deleted=counts[ACTION_DELETE],
+        unchanged=counts[ACTION_UNCHANGED],
+        failed=failed,
+        duration=time.monotonic() - started,
+    )
+
+
+def _digest(text: str) -> str:
+    """Return a short digest of a task description."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _state_matches(state: dict[str, Any], spec: TaskSpec) -> bool:
+    """Return True if a ledger state already reflects ``spec``."""
+    return (
+        state["title"] == spec.title
+        and state["date"] == spec.task_date.isoformat()
+        and state["digest"] == _digest(spec.description)
+    )
+
+
+def _new_state(entity_id: str, spec: TaskSpec, uid: str | None = None) -> dict[str, Any]:
+    """Build a ledger state for a task written to ``entity_id``."""
+    return {
+        "entity": entity_id,
+        "uid": uid,
+        "title": spec.title,
+        "date": spec.task_date.isoformat(),
+        "digest": _digest(spec.description),
+    }
+
+
+async def _async_adopt_existing(
+    hass: HomeAssistant,
+    records: dict[str, dict[str, Any]],
+    desired: dict[str, TaskSpec],
+    wanted: dict[str, str | None],
+) -> None:
+    """Record tasks that already exist on an entity but are missing from the ledger.
+
+    A state without a UID is added for every missing task and matched by
+    title like a newly created one; states that match nothing are dropped
+    again so the task gets created. The existing item may differ from the
+    spec, so adopted states are marked stale and rewritten once.
+    """
+    for side, entity_id in wanted.items():
+        if entity_id is None:
+            continue
+        added = []
+        for key, spec in desired.items():
+            record = records.setdefault(key, {})
+            if record.get(side) is None:
+                record[side] = _new_state(entity_id, spec)
+                added.append(record)
+        if not added:
+            continue
+
+        await _async_resolve_uids(hass, side, entity_id, records)
+        adopted = 0
+        for record in added:
+            if record[side]["uid"] is None:
+                del record[side]
+            else:
+                record[side]["digest"] = None
+                adopted += 1
+        if adopted:
+            _LOGGER.info("Adopted %d existing %s tasks on %s", adopted, side, entity_id)
+
+
+async def _async_create(
+    hass: HomeAssistant, record: dict[str, Any], side: str, entity_id: str, spec: TaskSpec
+) -> dict[str, Any]:
+    """Create one side of a task and record it without a UID yet."""
+    if side == SIDE_CALENDAR:
+        ok = await _async_create_calendar_event(hass, entity_id, spec)
+    else:
+        ok = await _async_create_todo_item(hass, entity_id, spec)
+    if ok:
+        record[side] = _new_state(entity_id, spec)
+    return {"day": spec.day, "side": side, "action": ACTION_CREATE, "ok": ok}
+
+
+async def _async_update(
+    hass: HomeAssistant, record: dict[str, Any], side: str, spec: TaskSpec
+) -> dict[str, Any]:
+    """Update one side of an existing task in place."""
+    state = record[side]
+    try:
+        if side == SIDE_CALENDAR:
+            if not await _async_update_calendar_event(hass, state, spec):
+                return await _async_replace_calendar_event(hass, record, spec)
+        elif not await _async_update_todo_item(hass, state, spec):
+            return {"day": spec.day, "side": side, "action": ACTION_UPDATE, "ok": False}
+    except Exception as err:
+        _LOGGER.error("Failed to update %s task '%s': %s", side, state["title"], err)
+        return {"day": spec.day, "side": side, "action": ACTION_UPDATE, "ok": False}
+
+    record[side] = _new_state(state["entity"], spec, state["uid"])
+    return {"day": spec.day, "side": side, "action": ACTION_UPDATE, "ok": True}
+
+
+async def _async_delete(
+    hass: HomeAssistant, record: dict[str, Any], side: str, key: str, state: dict[str, Any]
+) -> dict[str, Any]:
+    """Delete one side of a task and drop it from the ledger."""
+    try:
+        if side == SIDE_CALENDAR:
+            await _async_delete_calendar_event(hass, state)
+        else:
+            await hass.services.async_call(
+                "todo",
+                "remove_item",
+                {"entity_id": state["entity"], "item": [state["uid"] or state["title"]]},
+                blocking=True,
+            )
+    except Exception as err:
+        _LOGGER.error("Failed to delete %s task '%s': %s", side, state["title"], err)
+        return {"day": int(key), "side": side, "action": ACTION_DELETE, "ok": False}
+
+    # A replacement on another entity may already have been recorded
+    if record.get(side) is state:
+        del record[side]
+    return {"day": int(key), "side": side, "action": ACTION_DELETE, "ok": True}
+
+
+def _get_calendar_entity(hass: HomeAssistant, entity_id: str) -> Any:
+    """Return the calendar entity object for ``entity_id``."""
+    component = hass.data.get("calendar")
+    entity = component.get_entity(entity_id) if component else None
+    if entity is None:
+        raise HomeAssistantError(f"Calendar {entity_id} not found")
+    return entity
+
+
+def _calendar_bounds(hass: HomeAssistant, entity_id: str, task_date: date) -> tuple[Any, Any]:
+    """Return the start and end of an event using the entity's cached shape."""
+    if get_capability_cache(hass).get(entity_id) == SHAPE_TIMED:
+        start = dt_util.start_of_local_day(task_date) + timedelta(hours=8)
+        return start, start + timedelta(hours=1)
+    return task_date, task_date + timedelta(days=1)
+
+
+async def _async_find_calendar_uid(
+    hass: HomeAssistant, entity_id: str, title: str, task_date: str
+) -> str | None:
+    """Look up the UID of an event by title on its date."""
+    entity = _get_calendar_entity(hass, entity_id)
+    day = date.fromisoformat(task_date)
+    events = await entity.async_get_events(
+        hass,
+        dt_util.start_of_local_day(day),
+        dt_util.start_of_local_day(day + timedelta(days=1)),
+    )
+    return next((event.uid for event in events if event.summary == title), None)
+
+
+async def _async_update_calendar_event(
+    hass: HomeAssistant, state: dict[str, Any], spec: TaskSpec
+) -> bool:
+    """Update a calendar event through the calendar entity.
+
+    Returns False, without changing anything, if the calendar cannot update
+    events.
+    """
+    from homeassistant.components.calendar import CalendarEntityFeature
+
+    entity = _get_calendar_entity(hass, state["entity"])
+    if not (entity.supported_features or 0) & CalendarEntityFeature.UPDATE_EVENT:
+        return False
+
+    uid = state["uid"] or await _async_find_calendar_uid(
+        hass, state["entity"], state["title"], state["date"]
+    )
+    if uid is None:
+        raise HomeAssistantError(f"Event '{state['title']}' not found")
+
+    start, end = _calendar_bounds(hass, state["entity"], spec.task_date)
+    await entity.async_update_event(
+        uid,
+        {
+            "summary": spec.title,
+            "description": spec.description,
+            "dtstart": start,
+            "dtend": end,
+        },
+    )
+    state["uid"] = uid
+    return True
+
+
+async def _async_replace_calendar_event(
+    hass: HomeAssistant, record: dict[str, Any], spec: TaskSpec
+) -> dict[str, Any]:
+    """Delete an event and create it again, for calendars that cannot update events.
+
+    The new event is recorded without a UID, which is looked up after the
+    run like that of a created task. A calendar that cannot delete events
+    either keeps the old event.
+    """
+    from homeassistant.components.calendar import CalendarEntityFeature
+
+    state = record[SIDE_CALENDAR]
+    result = {"day": spec.day, "side": SIDE_CALENDAR, "action": ACTION_UPDATE, "ok": False}
+    entity = _get_calendar_entity(hass, state["entity"])
+    deleted = False
+    if (entity.supported_features or 0) & CalendarEntityFeature.DELETE_EVENT:
+        try:
+            await _async_delete_calendar_event(hass, state)
+        except Exception as err:
+            _LOGGER.error("Failed to replace calendar task '%s': %s", state["title"], err)
+            return result
+        deleted = True
+    else:
+        _LOGGER.warning(
+            "%s cannot update or delete events; '%s' stays on %s",
+            state["entity"], state["title"], state["date"],
+        )
+
+    if await _async_create_calendar_event(hass, state["entity"], spec):
+        record[SIDE_CALENDAR] = _new_state(state["entity"], spec)
+        result["ok"] = True
+    elif deleted:
+        # The old event is gone; let the next run create the task
+        del record[SIDE_CALENDAR]
+    return result
+
+
+async def _async_delete_calendar_event(hass: HomeAssistant, state: dict[str, Any]) -> None:
+    """Delete a calendar event through the calendar entity."""
+    from homeassistant.components.calendar import CalendarEntityFeature
+
+    entity = _get_calendar_entity(hass, state["entity"])
+    if not (entity.supported_features or 0) & CalendarEntityFeature.DELETE_EVENT:
+        raise HomeAssistantError(f"{state['entity']} does not support deleting events")
+
+    uid = state["uid"] or await _async_find_calendar_uid(
+        hass, state["entity"], state["title"], state["date"]
+    )
+    if uid is None:
+        # Already gone; nothing left to delete
+        return
+    await entity.async_delete_event(uid)
+
+
+async def _async_resolve_uids(
+    hass: HomeAssistant, side: str, entity_id: str, records: dict[str, dict[str, Any]]
+) -> None:
+    """Fill in UIDs for newly created tasks on ``entity_id``."""
+    pending = [
+        record[side] for record in records.values()
+        if record.get(side) and record[side]["entity"] == entity_id and record[side]["uid"] is None
+    ]
+    if not pending:
+        return
+    known = {
+        record[side]["uid"] for record in records.values()
+        if record.get(side) and record[side]["uid"]
+    }
+
+    try:
+        if side == SIDE_CALENDAR:
+            entity = _get_calendar_entity(hass, entity_id)
+            dates = [date.fromisoformat(state["date"]) for state in pending]
+            found = await entity.async_get_events(
+                hass,
+                dt_util.start_of_local_day(min(dates)),
+                dt_util.start_of_local_day(max(dates) + timedelta(days=1)),
+            )
+            items = [(event.summary, event.uid) for event in found]
+        else:
+            response = await hass.services.async_call(
+                "todo",
+                "get_items",
+                {"entity_id": entity_id},
+                blocking=True,
+                return_response=True,
+            )
+            items = [
+                (item.get("summary"), item.get("uid"))
+                for item in response.get(entity_id, {}).get("items", [])
+            ]
+    except Exception as err:
+        _LOGGER.warning("Could not look up UIDs on %s: %s", entity_id, err)
+        return
+
+    by_title: dict[str, list[str]] = {}
+    for title, uid in items:
+        if uid and uid not in known:
+            by_title.setdefault(title, []).append(uid)
+    for state in pending:
+        uids = by_title.get(state["title"])
+        if uids:
+            state["uid"] = uids.pop(0)
+
+
+def get_capability_cache(hass: HomeAssistant) -> CapabilityCache:
+    """Return the shared capability cache."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if "capabilities" not in data:
+        data["capabilities"] = CapabilityCache(hass)
+    return data["capabilities"]
+
+
+class CapabilityCache:
+    """Remember which payload shape each calendar/todo entity accepts.
+
+    The first task for an entity probes the shapes in order while other tasks
+    for that entity wait, and the working shape is reused by every later call.
+    An entry is dropped when its entity is removed or re-added (which is what
+    an integration reload looks like from here) or when the cached shape stops
+    working.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._shapes: dict[str, str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._unsubs: dict[str, CALLBACK_TYPE] = {}
+
+    def get(self, entity_id: str) -> str | None:
+        """Return the cached shape for an entity."""
+        return self._shapes.get(entity_id)
+
+    def lock(self, entity_id: str) -> asyncio.Lock:
+        """Return the probe lock for an entity."""
+        return self._locks.setdefault(entity_id, asyncio.Lock())
+
+    @callback
+    def set(self, entity_id: str, shape: str) -> None:
+        """Cache the working shape for an entity."""
+        self._shapes[entity_id] = shape
+        if entity_id not in self._unsubs:
+            self._unsubs[entity_id] = async_track_state_change_event(
+                self.hass, [entity_id], self._async_state_changed
+            )
+
+    @callback
+    def invalidate(self, entity_id: str) -> None:
+        """Forget the cached shape for an entity."""
+        if self._shapes.pop(entity_id, None) is not None:
+            _LOGGER.debug("Cleared cached payload shape for %s", entity_id)
+        unsub = self._unsubs.pop(entity_id, None)
+        if unsub:
+            unsub()
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Invalidate when the entity is removed, re-added or unavailable."""
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is None or new_state is None or new_state.state == STATE_UNAVAILABLE:
+            self.invalidate(event.data["entity_id"])
+
+
+async def _async_call_with_shapes(
+    hass: HomeAssistant,
+    domain: str,
+    service: str,
+    entity_id: str,
+    payloads: list[tuple[str, dict[str, Any]]],
+) -> bool:
+    """Call a service using the entity's cached payload shape.
+
+    ``payloads`` lists (shape, service data) pairs in order of preference.
+    """
+    cache = get_capability_cache(hass)
+    shape = cache.get(entity_id)
+    if shape is None:
+        async with cache.lock(entity_id):
+            shape = cache.get(entity_id)
+            if shape is None:
+                return await _async_probe(hass, cache, domain, service, entity_id, payloads)
+
+    try:
+        await hass.services.async_call(domain, service, dict(payloads)[shape], blocking=True)
+        return True
+    except Exception as err:
+        # The cached shape stopped working; let the next task probe again
+        cache.invalidate(entity_id)
+        _LOGGER.error("Failed to call %s.%s for %s: %s", domain, service, entity_id, err)
+        return False
+
+
+async def _async_probe(
+    hass: HomeAssistant,
+    cache: CapabilityCache,
+    domain: str,
+    service: str,
+    entity_id: str,
+    payloads: list[tuple[str, dict[str, Any]]],
+) -> bool:
+    """Try each payload shape in turn and cache the first that works."""
+    for shape, payload in payloads:
+        try:
+            await hass.services.async_call(domain, service, payload, blocking=True)
+        except Exception as err:
+            _LOGGER.warning(
+                "%s.%s with %s payload failed for %s: %s", domain, service, shape, entity_id, err
+            )
+            continue
+        cache.set(entity_id, shape)
+        _LOGGER.debug("Using %s payload for %s.%s on %s", shape, domain, service, entity_id)
+        return True
+
+    _LOGGER.error("Failed to call %s.%s for %s with any payload", domain, service, entity_id)
+    return False
+
+
+async def _async_create_calendar_event(
+    hass: HomeAssistant, calendar_entity: str, spec: TaskSpec
+) -> bool:
+    """Create an all-day calendar event, falling back to a timed event."""
+    start_dt = datetime.combine(spec.task_date, datetime.min.time().replace(hour=8))
+    end_dt = datetime.combine(spec.task_date, datetime.min.time().replace(hour=9))
+    base = {
+        "entity_id": calendar_entity,
+        "summary": spec.title,
+        "description": spec.description,
+    }
+    return await _async_call_with_shapes(
+        hass,
+        "calendar",
+        "create_event",
+        calendar_entity,
+        [
+            (SHAPE_ALL_DAY, {
+                **base,
+                "start_date": str(spec.task_date),
+                "end_date": str(spec.task_date + timedelta(days=1)),
+            }),
+            (SHAPE_TIMED, {
+                **base,
+                "start_date_time": start_dt.isoformat(),
+                "end_date_time": end_dt.isoformat(),
+            }),
+        ],
+    )
+
+
+async def _async_create_todo_item(
+    hass: HomeAssistant, todo_entity: str, spec: TaskSpec
+) -> bool:
+    """Create a todo item with a description, falling back to without."""
+    base = {
+        "entity_id": todo_entity,
+        "item": spec.title,
+        "due_date": str(spec.task_date),
+    }
+    # Some integrations don't support descriptions
+    return await _async_call_with_shapes(
+        hass,
+        "todo",
+        "add_item",
+        todo_entity,
+        [
+            (SHAPE_WITH_DESCRIPTION, {**base, "description": spec.description}),
+            (SHAPE_PLAIN, base),
+        ],
+    )
+
+
+async def _async_update_todo_item(
+    hass: HomeAssistant, state: dict[str, Any], spec: TaskSpec
+) -> bool:
+    """Update a todo item, with the same description fallback as creating one."""
+    base = {
+        "entity_id": state["entity"],
+        "item": state["uid"] or state["title"],
+        "rename": spec.title,
+        "due_date": str(spec.task_date),
+    }
+    return await _async_call_with_shapes(
+        hass,
+        "todo",
+        "update_item",
+        state["entity"],
+        [
+            (SHAPE_WITH_DESCRIPTION, {**base, "description": spec.description}),
+            (SHAPE_PLAIN, base),
+        ],
+    )
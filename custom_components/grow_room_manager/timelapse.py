@@ -0,0 +1,239 @@
+"""Timelapse building from journal snapshots for Grow Room Manager."""
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import struct
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .journal import JournalStore
+from .render import entry_photos
+from .storage import atomic_open
+
+try:
+    from PIL import GifImagePlugin, Image, ImageDraw, ImageOps
+except ImportError:
+    Image = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Worker threads decoding, scaling and encoding frames; Pillow releases the
+# GIL while it does so
+TIMELAPSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Frames handed to the workers at once; bounds the memory held in flight
+TIMELAPSE_CHUNK = TIMELAPSE_WORKERS * 4
+
+# Contact sheet layout
+SHEET_TILES = 48
+SHEET_COLUMNS = 6
+SHEET_TILE_WIDTH = 240
+SHEET_QUALITY = 80
+
+# Minimum seconds between progress reports
+PROGRESS_INTERVAL = 1.0
+
+ProgressCallback = Callable[[int, int], None]
+
+FrameJob = tuple[str, tuple[int, int], int, tuple[int, int] | None, str]
+
+
+class Frame(NamedTuple):
+    """One snapshot in the timelapse."""
+
+    path: str
+    timestamp: str
+
+
+class TimelapseResult(NamedTuple):
+    """Summary of a finished timelapse."""
+
+    frames: int
+    skipped: int
+    size: int
+    sheet_tiles: int
+
+
+def collect_frames(
+    store: JournalStore,
+    image_dir: Path,
+    camera: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    max_frames: int | None = None,
+) -> list[Frame]:
+    """Return the room's snapshots in timestamp order.
+
+    The journal is streamed and only file paths are kept. Each entry
+    contributes the snapshot of ``camera``, or its main snapshot.
+    Consecutive identical snapshots (the same content-addressed file) are
+    dropped, and if more than ``max_frames`` remain they are sampled evenly.
+
+    Blocking; must run in the executor.
+    """
+    frames: list[Frame] = []
+    last_name = None
+    for entry in store.iter_entries():
+        timestamp = entry.get("timestamp") or ""
+        if (since and timestamp < since) or (until and timestamp >= until):
+            continue
+        photos = entry_photos(entry)
+        if camera:
+            photos = [photo for photo in photos if photo.get("entity_id") == camera]
+        if not photos or not photos[0].get("image_path"):
+            continue
+        name = Path(photos[0]["image_path"]).name
+        path = image_dir / name
+        if name == last_name or not path.is_file():
+            continue
+        last_name = name
+        frames.append(Frame(str(path), timestamp))
+
+    if max_frames and len(frames) > max_frames:
+        step = len(frames) / max_frames
+        frames = [frames[int(i * step)] for i in range(max_frames)]
+    return frames
+
+
+def build_timelapse(
+    frames: list[Frame],
+    gif_path: Path,
+    sheet_path: Path,
+    width: int,
+    fps: int,
+    progress: ProgressCallback | None = None,
+) -> TimelapseResult:
+    """Write an animated GIF of ``frames`` and a contact sheet.
+
+    Frames are decoded, scaled and encoded by a pool of worker threads, a
+    chunk at a time, and the encoded GIF frames are appended to the output
+    as they come back, so memory does not grow with the number of frames.
+    Every frame carries its own palette. Snapshots that cannot be read are
+    skipped. The files appear only once complete.
+
+    Blocking and CPU bound; must run in the executor.
+    """
+    if Image is None:
+        raise HomeAssistantError("Building a timelapse requires Pillow")
+    if not frames:
+        raise HomeAssistantError("No snapshots to build a timelapse from")
+
+    with Image.open(frames[0].path) as first:
+        canvas = (width, max(1, round(width * first.height / first.width)))
+    tile = (SHEET_TILE_WIDTH, max(1, round(SHEET_TILE_WIDTH * canvas[1] / canvas[0])))
+    tile_count = min(SHEET_TILES, len(frames))
+    tile_indexes = {round(i * (len(frames) - 1) / max(1, tile_count - 1)) for i in range(tile_count)}
+    duration = round(1000 / fps)
+
+    jobs: Iterator[FrameJob] = (
+        (frame.path, canvas, duration, tile if index in tile_indexes else None, frame.timestamp)
+        for index, frame in enumerate(frames)
+    )
+    written = skipped = 0
+    tiles: list[bytes] = []
+    last_report = time.monotonic()
+
+    with ThreadPoolExecutor(TIMELAPSE_WORKERS, thread_name_prefix="timelapse") as pool:
+        with atomic_open(gif_path, durable=False) as f:
+            f.write(_gif_header(canvas))
+            for chunk in _chunks(jobs, TIMELAPSE_CHUNK):
+                for data, tile_data in pool.map(_render_frame, chunk):
+                    if data is None:
+                        skipped += 1
+                        continue
+                    f.write(data)
+                    written += 1
+                    if tile_data is not None:
+                        tiles.append(tile_data)
+                if progress and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    progress(written + skipped, len(frames))
+            if not written:
+                raise HomeAssistantError("None of the snapshots could be read")
+            f.write(b";")
+
+    with atomic_open(sheet_path, durable=False) as f:
+        f.write(_contact_sheet(tiles, tile))
+    if progress:
+        progress(written + skipped, len(frames))
+    return TimelapseResult(written, skipped, gif_path.stat().st_size, len(tiles))
+
+
+def _chunks(jobs: Iterator[FrameJob], size: int) -> Iterator[list[FrameJob]]:
+    """Split jobs into lists of at most ``size``."""
+    while chunk := list(islice(jobs, size)):
+        yield chunk
+
+
+def _gif_header(canvas: tuple[int, int]) -> bytes:
+    """Return a GIF header without a global palette, looping forever."""
+    return (
+        b"GIF89a"
+        + struct.pack("<HHBBB", canvas[0], canvas[1], 0, 0, 0)
+        + b"!\xff\x0bNETSCAPE2.0\x03\x01"
+        + struct.pack("<H", 0)
+        + b"\x00"
+    )
+
+
+def _render_frame(job: FrameJob) -> tuple[bytes | None, bytes | None]:
+    """Encode one snapshot as a GIF frame, plus a labelled contact sheet tile.
+
+    ``job`` is (path, canvas size, frame duration, tile size or None,
+    timestamp). Runs in a worker thread. Returns (None, None) for an
+    unreadable snapshot.
+    """
+    path, canvas, duration, tile, timestamp = job
+    try:
+        with Image.open(path) as image:
+            image.draft("RGB", canvas)
+            frame = ImageOps.pad(image.convert("RGB"), canvas, color=(0, 0, 0))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None
+
+    paletted = frame.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+    data = b"".join(
+        GifImagePlugin.getdata(paletted, duration=duration, include_color_table=True)
+    )
+
+    tile_data = None
+    if tile is not None:
+        thumb = frame.resize(tile, Image.Resampling.LANCZOS)
+        draw = ImageDraw.Draw(thumb)
+        draw.rectangle((0, tile[1] - 16, tile[0], tile[1]), fill=(0, 0, 0))
+        draw.text((4, tile[1] - 14), _label(timestamp), fill=(255, 255, 255))
+        buffer = io.BytesIO()
+        thumb.save(buffer, "JPEG", quality=SHEET_QUALITY)
+        tile_data = buffer.getvalue()
+    return data, tile_data
+
+
+def _label(timestamp: str) -> str:
+    """Format a journal timestamp for a contact sheet tile."""
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return timestamp[:16]
+
+
+def _contact_sheet(tiles: list[bytes], tile: tuple[int, int]) -> bytes:
+    """Lay the tiles out in a grid and return it as JPEG."""
+    columns = min(SHEET_COLUMNS, len(tiles))
+    rows = math.ceil(len(tiles) / columns)
+    sheet = Image.new("RGB", (columns * tile[0], rows * tile[1]), (0, 0, 0))
+    for index, tile_data in enumerate(tiles):
+        with Image.open(io.BytesIO(tile_data)) as image:
+            sheet.paste(image, ((index % columns) * tile[0], (index // columns) * tile[1]))
+    buffer = io.BytesIO()
+    sheet.save(buffer, "JPEG", quality=SHEET_QUALITY, optimize=True)
+    return buffer.getvalue()
@@ -1,39 +1,143 @@
 #!/usr/bin/env python3
 """
 Journal Reader Script for Home Assistant command_line sensor.
-Reads grow journal JSON files and formats them for display in Lovelace.
+Reads grow journal JSON lines files and formats them for display in Lovelace.
+
+Only the end of the journal is read when listing recent entries, so each run
+costs the same however long the journal grows. The integration also renders
+the recent entries itself, in the "markdown" attribute of the
+sensor.<room>_journal_entries sensor, which makes this script unnecessary
+unless you need a different number of entries or search.
 
 Usage:
-  python3 journal_reader.py <room_id> [max_entries]
+  python3 journal_reader.py <room_id> [max_entries] [search words...]
 
 Example:
   python3 journal_reader.py f1 10
+  python3 journal_reader.py f1 5 powdery mildew
 """
 
 import json
+import os
+import re
+import sqlite3
 import sys
 from pathlib import Path
 from datetime import datetime
 
+# Bytes read per step when reading the journal backwards
+TAIL_BLOCK_SIZE = 64 * 1024
 
-def format_journal(room_id: str, max_entries: int = 10) -> str:
-    """Read and format journal entries for a room."""
-    journal_path = Path(f"/config/grow_logs/{room_id}.json")
+
+def read_entries(room_id: str) -> list:
+    """Read all journal entries for a room, oldest first."""
+    journal_path = Path(f"/config/grow_logs/{room_id}.jsonl")
+    legacy_path = Path(f"/config/grow_logs/{room_id}.json")
+    
+    if journal_path.exists():
+        entries = []
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+    
+    if legacy_path.exists():
+        with open(legacy_path, "r") as f:
+            return json.load(f)
     
+    return []
+
+
+def read_tail(room_id: str, max_entries: int) -> list:
+    """Read the last max_entries journal entries, oldest first.
+
+    The file is read backwards in blocks until enough complete lines have
+    been found, instead of parsing the whole journal.
+    """
+    journal_path = Path(f"/config/grow_logs/{room_id}.jsonl")
     if not journal_path.exists():
-        return "No journal entries yet."
+        return read_entries(room_id)[-max_entries:] if max_entries > 0 else []
+    if max_entries <= 0:
+        return []
     
+    with open(journal_path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # One extra newline so the first kept line is known to be complete
+        while position > 0 and data.count(b"\n") <= max_entries:
+            step = min(TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    
+    lines = data.split(b"\n")
+    if position > 0:
+        # The first line is cut off at the block boundary
+        lines = lines[1:]
+    entries = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(entry, dict):
+            entries.append(entry)
+    return entries[-max_entries:]
+
+
+def search_entries(room_id: str, query: str, max_entries: int) -> list:
+    """Return the entries best matching query, using the integration's search index."""
+    index_path = Path(f"/config/grow_logs/{room_id}.search.sqlite")
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return []
+    
+    if index_path.exists():
+        match = " ".join(f'"{token}"' for token in tokens) + "*"
+        try:
+            conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    "SELECT timestamp, note, image_url, thumb_url FROM notes"
+                    " WHERE notes MATCH ? ORDER BY rank LIMIT ?",
+                    (match, max_entries),
+                ).fetchall()
+            finally:
+                conn.close()
+            return [
+                {"timestamp": ts, "note": note, "image_url": url, "thumb_url": thumb}
+                for ts, note, url, thumb in rows
+            ]
+        except sqlite3.Error:
+            pass
+    
+    # No usable index yet: fall back to scanning the journal
+    words = [token.lower() for token in tokens]
+    matches = [
+        e for e in read_entries(room_id)
+        if all(word in e.get("note", "").lower() for word in words)
+    ]
+    return matches[-max_entries:][::-1]
+
+
+def format_journal(room_id: str, max_entries: int = 10, query: str = "") -> str:
+    """Read and format journal entries for a room."""
     try:
-        with open(journal_path, "r") as f:
-            entries = json.load(f)
+        if query:
+            recent = search_entries(room_id, query, max_entries)
+        else:
+            # Get last N entries, reversed (newest first)
+            recent = read_tail(room_id, max_entries)[::-1]
     except (json.JSONDecodeError, IOError) as e:
         return f"Error reading journal: {e}"
     
-    if not entries:
-        return "No journal entries yet."
-    
-    # Get last N entries, reversed (newest first)
-    recent = entries[-max_entries:][::-1]
+    if not recent:
+        return f"No journal entries match '{query}'." if query else "No journal entries yet."
     
     output_lines = []
     for entry in recent:
@@ -46,12 +150,18 @@ def format_journal(room_id: str, max_entries: int = 10) -> str:
             ts_formatted = ts[:16]
         
         note = entry.get("note", "")
-        image_url = entry.get("image_url")
+        # One snapshot per camera; older entries only have the top-level URLs
+        photos = entry.get("images") or [entry]
         
-        # Build entry line
+        # Build entry line, showing thumbnails when there are any
         line = f"**{ts_formatted}**\n{note}"
-        if image_url:
-            line += f"\n📷 [View Photo]({image_url})"
+        for photo in photos:
+            image_url = photo.get("image_url")
+            thumb_url = photo.get("thumb_url")
+            if thumb_url:
+                line += f"\n[![Photo]({thumb_url})]({image_url})"
+            elif image_url:
+                line += f"\n📷 [View Photo]({image_url})"
         
         output_lines.append(line)
     
@@ -60,13 +170,14 @@ def format_journal(room_id: str, max_entries: int = 10) -> str:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: journal_reader.py <room_id> [max_entries]")
+        print("Usage: journal_reader.py <room_id> [max_entries] [search words...]")
         sys.exit(1)
     
     room_id = sys.argv[1]
     max_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    query = " ".join(sys.argv[3:])
     
-    print(format_journal(room_id, max_entries))
+    print(format_journal(room_id, max_entries, query))
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Tests for the Grow Room Manager integration."""
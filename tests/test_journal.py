@@ -0,0 +1,101 @@
+"""Tests for the append-only journal store."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.grow_room_manager.journal import JournalStore
+from custom_components.grow_room_manager.storage import CorruptFileError
+
+
+def _entry(day: int, hour: int = 8) -> dict:
+    """Return a journal entry for a day of January 2024."""
+    return {"timestamp": f"2024-01-{day:02d}T{hour:02d}:00:00", "note": f"day {day} {hour}h"}
+
+
+def test_migrates_legacy_journal(tmp_path: Path) -> None:
+    """A legacy JSON array journal is converted to JSON lines on first use."""
+    entries = [_entry(1), _entry(2)]
+    (tmp_path / "f1.json").write_text(json.dumps(entries))
+
+    store = JournalStore(tmp_path, "f1")
+
+    assert store.read_all() == entries
+    assert store.count() == 2
+    assert not (tmp_path / "f1.json").exists()
+    assert (tmp_path / "f1.json.migrated").is_file()
+
+
+def test_corrupt_legacy_journal_is_quarantined(tmp_path: Path) -> None:
+    """A legacy journal that does not parse is moved aside and reported."""
+    (tmp_path / "f1.json").write_text('[{"note": "cut')
+    store = JournalStore(tmp_path, "f1")
+
+    with pytest.raises(CorruptFileError) as err:
+        store.count()
+
+    assert not (tmp_path / "f1.json").exists()
+    assert err.value.quarantine_path.is_file()
+
+
+def test_query_time_range(tmp_path: Path) -> None:
+    """Range queries return matching entries, most recent first."""
+    store = JournalStore(tmp_path, "f1")
+    for day in range(1, 11):
+        for hour in (8, 20):
+            store.append(_entry(day, hour))
+
+    page = store.query(since="2024-01-03", until="2024-01-05")
+
+    assert page.total == 4
+    assert page.entries == [_entry(4, 20), _entry(4, 8), _entry(3, 20), _entry(3, 8)]
+    assert page.next_cursor is None
+
+
+def test_query_pages_by_cursor(tmp_path: Path) -> None:
+    """Paging by cursor walks the range without gaps or repeats."""
+    store = JournalStore(tmp_path, "f1")
+    for day in range(1, 31):
+        store.append(_entry(day))
+
+    seen = []
+    cursor = None
+    while True:
+        page = store.query(since="2024-01-05", cursor=cursor, limit=7)
+        seen.extend(entry["timestamp"] for entry in page.entries)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+        store.append(_entry(31, len(seen) % 24))
+
+    assert seen == [_entry(day)["timestamp"] for day in range(30, 4, -1)]
+
+
+def test_recovers_from_torn_trailing_line(tmp_path: Path) -> None:
+    """A partially written last line is skipped and does not swallow the next entry."""
+    store = JournalStore(tmp_path, "f1")
+    store.append(_entry(1))
+    store.append(_entry(2))
+    with open(tmp_path / "f1.jsonl", "ab") as f:
+        f.write(b'{"timestamp": "2024-01-03T08:00:00", "no')
+
+    store = JournalStore(tmp_path, "f1")
+    assert store.count() == 2
+
+    assert store.append(_entry(4)) == 2
+    assert store.read_all() == [_entry(1), _entry(2), _entry(4)]
+    assert store.last_entry() == _entry(4)
+
+
+def test_append_after_external_write(tmp_path: Path) -> None:
+    """Entries written outside the store are indexed before appending."""
+    store = JournalStore(tmp_path, "f1")
+    for day in (1, 2, 3):
+        store.append(_entry(day))
+    with open(tmp_path / "f1.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(_entry(4)) + "\n")
+
+    assert store.append(_entry(5)) == 4
+    assert store.tail(3) == [_entry(3), _entry(4), _entry(5)]
@@ -0,0 +1,160 @@
+"""Tests for snapshot storage and cleanup."""
+from __future__ import annotations
+
+import io
+import os
+import time
+from pathlib import Path
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.grow_room_manager.journal import JournalStore
+from custom_components.grow_room_manager.snapshots import (
+    SNAPSHOT_NAME,
+    THUMBNAIL_DIR,
+    SnapshotRefs,
+    save_snapshot,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+GRACE = 3600
+
+
+def _jpeg(color: tuple[int, int, int]) -> bytes:
+    """Return a small JPEG of a single color."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _age(*paths: Path) -> None:
+    """Make files look older than the cleanup grace period."""
+    past = time.time() - 2 * GRACE
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+@pytest.fixture
+def image_dir(tmp_path: Path) -> Path:
+    """Return the room's image directory."""
+    return tmp_path / "www" / "f1"
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> JournalStore:
+    """Return an empty journal."""
+    return JournalStore(tmp_path, "f1")
+
+
+@pytest.fixture
+def refs(tmp_path: Path, image_dir: Path, store: JournalStore) -> SnapshotRefs:
+    """Return the reference map of the room."""
+    return SnapshotRefs(tmp_path / "f1_snapshot_refs.json", image_dir, store)
+
+
+def _append(store: JournalStore, image_dir: Path, snapshot) -> None:
+    """Append a journal entry referring to a snapshot."""
+    store.append({
+        "timestamp": "2024-01-01T08:00:00",
+        "note": "",
+        "image_path": str(image_dir / snapshot.image),
+        "thumb_path": str(image_dir / snapshot.thumbnail),
+    })
+
+
+def test_save_snapshot_names_files_by_content(image_dir: Path) -> None:
+    """Snapshots are stored under the hash of the camera image."""
+    red = save_snapshot(_jpeg((255, 0, 0)), image_dir)
+    blue = save_snapshot(_jpeg((0, 0, 255)), image_dir)
+
+    assert red.image != blue.image
+    assert SNAPSHOT_NAME.fullmatch(red.image)
+    assert red.thumbnail == f"{THUMBNAIL_DIR}/{red.image}"
+    assert (image_dir / red.image).is_file()
+    assert (image_dir / red.thumbnail).is_file()
+    assert not red.reused
+
+
+def test_save_snapshot_reuses_existing_files(image_dir: Path) -> None:
+    """An identical image is not decoded or written again."""
+    content = _jpeg((0, 128, 0))
+    first = save_snapshot(content, image_dir)
+    _age(image_dir / first.image)
+    mtime = (image_dir / first.image).stat().st_mtime
+
+    second = save_snapshot(content, image_dir)
+
+    assert second == first._replace(reused=True)
+    assert (image_dir / first.image).stat().st_mtime == mtime
+    assert sorted(p.name for p in image_dir.iterdir() if p.is_file()) == [first.image]
+
+
+def test_collect_keeps_referenced_and_recent_files(
+    image_dir: Path, store: JournalStore, refs: SnapshotRefs
+) -> None:
+    """Only old snapshots that no entry refers to are deleted."""
+    kept = save_snapshot(_jpeg((1, 0, 0)), image_dir)
+    old = save_snapshot(_jpeg((2, 0, 0)), image_dir)
+    recent = save_snapshot(_jpeg((3, 0, 0)), image_dir)
+    _append(store, image_dir, kept)
+    _age(
+        image_dir / kept.image, image_dir / kept.thumbnail,
+        image_dir / old.image, image_dir / old.thumbnail,
+    )
+
+    result = refs.collect(GRACE)
+
+    assert result["files"] == sorted([old.image, old.thumbnail])
+    assert result["removed"] == 2
+    for name in (kept.image, kept.thumbnail, recent.image, recent.thumbnail):
+        assert (image_dir / name).is_file()
+    assert not (image_dir / old.image).exists()
+    assert not (image_dir / old.thumbnail).exists()
+
+
+def test_collect_skips_files_it_did_not_write(
+    image_dir: Path, store: JournalStore, refs: SnapshotRefs
+) -> None:
+    """Files not named like snapshots are never deleted."""
+    kept = save_snapshot(_jpeg((4, 0, 0)), image_dir)
+    _append(store, image_dir, kept)
+    others = [image_dir / "timelapse.gif", image_dir / "photo.jpg", image_dir / "notes.txt"]
+    for path in others:
+        path.write_bytes(b"not a snapshot")
+    _age(*others)
+
+    result = refs.collect(GRACE)
+
+    assert result["removed"] == 0
+    assert all(path.is_file() for path in others)
+
+
+def test_collect_dry_run_deletes_nothing(
+    image_dir: Path, store: JournalStore, refs: SnapshotRefs
+) -> None:
+    """A dry run reports the files without deleting them."""
+    kept = save_snapshot(_jpeg((5, 0, 0)), image_dir)
+    old = save_snapshot(_jpeg((6, 0, 0)), image_dir)
+    _append(store, image_dir, kept)
+    _age(image_dir / old.image, image_dir / old.thumbnail)
+
+    result = refs.collect(GRACE, dry_run=True)
+
+    assert result["files"] == sorted([old.image, old.thumbnail])
+    assert (image_dir / old.image).is_file()
+    assert (image_dir / old.thumbnail).is_file()
+
+
+def test_collect_refuses_without_references(
+    image_dir: Path, refs: SnapshotRefs
+) -> None:
+    """Nothing is deleted when the journal refers to no snapshot."""
+    old = save_snapshot(_jpeg((7, 0, 0)), image_dir)
+    _age(image_dir / old.image)
+
+    with pytest.raises(HomeAssistantError):
+        refs.collect(GRACE)
+
+    assert (image_dir / old.image).is_file()